@@ -0,0 +1,160 @@
+"""
+Parties sans affichage jouées par l'IA seule (CSPSolver), sur plusieurs processus.
+Chaque partie a sa graine (seed + numéro de partie) : les résultats ne dépendent pas
+du nombre de processus.
+
+    python benchmark.py --games 200 --json cache/baseline.json --csv cache/games.csv
+    python benchmark.py --games 200 --compare cache/baseline.json
+    python benchmark.py --custom 50 50 500 --games 20
+"""
+import os
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from minesweeper import LEVELS, MinesweeperGame, CSPSolver  # noqa: E402
+
+# Régression signalée si le taux de victoire d'un niveau perd plus de 3 points par rapport
+# à la baseline, ou si le p95 du temps d'un coup de l'IA dépasse 1,5 fois celui de la baseline
+WIN_RATE_TOLERANCE = 0.03
+LATENCY_TOLERANCE = 1.5
+
+
+# ---------- Parties ----------
+def play_game(rows, cols, mines, seed, no_guess=False):
+    """Une partie complète jouée par l'IA, avec le temps de chaque appel à find_safe_moves."""
+    game = MinesweeperGame(rows, cols, mines, rng=random.Random(seed), no_guess=no_guess)
+    ai = CSPSolver(game, verbose=False)
+    move_ms = []
+    # Garde-fou : chaque appel révèle ou marque au moins une case
+    for _ in range(2 * rows * cols):
+        if game.game_over:
+            break
+        start = time.perf_counter()
+        moves = ai.find_safe_moves()
+        move_ms.append((time.perf_counter() - start) * 1000)
+        if not moves:
+            break
+        game.apply_moves(moves)
+    return {
+        "seed": seed,
+        "win": game.win,
+        "moves": len(move_ms),
+        "move_ms": move_ms,
+        "cp_sat_calls": ai.stats["cp_sat_calls"],
+        "guesses": ai.stats["guesses"],
+    }
+
+
+def play_games(rows, cols, mines, seeds, no_guess=False):
+    return [play_game(rows, cols, mines, seed, no_guess) for seed in seeds]
+
+
+def chunked(items, n_chunks):
+    size = max(1, -(-len(items) // n_chunks))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# ---------- Stats ----------
+def summarize(name, rows, cols, mines, results, elapsed):
+    move_ms = np.array([t for r in results for t in r["move_ms"]])
+    return {
+        "level": name,
+        "rows": rows,
+        "cols": cols,
+        "mines": mines,
+        "games": len(results),
+        "win_rate": round(sum(r["win"] for r in results) / len(results), 4),
+        "move_ms_mean": round(float(move_ms.mean()), 3) if move_ms.size else 0.0,
+        "move_ms_p95": round(float(np.percentile(move_ms, 95)), 3) if move_ms.size else 0.0,
+        "cp_sat_calls_mean": round(sum(r["cp_sat_calls"] for r in results) / len(results), 2),
+        "guesses_mean": round(sum(r["guesses"] for r in results) / len(results), 3),
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+def compare(report, baseline):
+    """Régressions de `report` par rapport à `baseline` (liste vide si aucune)."""
+    problems = []
+    old_levels = {level["level"]: level for level in baseline["levels"]}
+    for level in report["levels"]:
+        old = old_levels.get(level["level"])
+        if old is None:
+            continue
+        if level["win_rate"] < old["win_rate"] - WIN_RATE_TOLERANCE:
+            problems.append(f"{level['level']}: win rate {old['win_rate']} -> {level['win_rate']}")
+        if old["move_ms_p95"] and level["move_ms_p95"] > old["move_ms_p95"] * LATENCY_TOLERANCE:
+            problems.append(f"{level['level']}: move p95 {old['move_ms_p95']}ms -> {level['move_ms_p95']}ms")
+    return problems
+
+
+# ---------- Main ----------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sans affichage de l'IA du démineur")
+    parser.add_argument("--games", type=int, default=100, help="parties par niveau")
+    parser.add_argument("--levels", nargs="+", choices=tuple(LEVELS), default=list(LEVELS))
+    parser.add_argument("--custom", nargs=3, type=int, metavar=("ROWS", "COLS", "MINES"),
+                        help="grille personnalisée (remplace --levels)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-guess", action="store_true", help="grilles résolubles sans hasard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", default=None, help="rapport JSON (résumé par niveau)")
+    parser.add_argument("--csv", default=None, help="une ligne par partie")
+    parser.add_argument("--compare", default=None, help="rapport JSON de référence")
+    args = parser.parse_args()
+
+    if args.custom:
+        rows, cols, mines = args.custom
+        boards = [(f"{rows}x{cols}/{mines}", rows, cols, mines)]
+    else:
+        boards = [(name, LEVELS[name]["size"][1], LEVELS[name]["size"][0], LEVELS[name]["mines"])
+                  for name in args.levels]
+
+    report = {"seed": args.seed, "no_guess": args.no_guess, "levels": []}
+    rows_out = []
+    with ProcessPoolExecutor(args.workers) as pool:
+        for name, rows, cols, mines in boards:
+            start = time.perf_counter()
+            seeds = chunked(list(range(args.seed, args.seed + args.games)), args.workers * 4)
+            parts = pool.map(play_games, [rows] * len(seeds), [cols] * len(seeds), [mines] * len(seeds), seeds,
+                             [args.no_guess] * len(seeds))
+            results = [r for part in parts for r in part]
+            summary = summarize(name, rows, cols, mines, results, time.perf_counter() - start)
+            report["levels"].append(summary)
+            rows_out += [{"level": name, **{k: v for k, v in r.items() if k != "move_ms"},
+                          "move_ms_mean": round(sum(r["move_ms"]) / max(1, r["moves"]), 3)}
+                         for r in results]
+            print(json.dumps(summary, ensure_ascii=False))
+
+    for path, write in ((args.json, lambda f: json.dump(report, f, indent=2, ensure_ascii=False)),
+                        (args.csv, lambda f: _write_csv(f, rows_out))):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                write(f)
+            print(f"Écrit dans {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            problems = compare(report, json.load(f))
+        for p in problems:
+            print(f"RÉGRESSION : {p}")
+        if problems:
+            sys.exit(1)
+
+
+def _write_csv(f, rows):
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["level"])
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
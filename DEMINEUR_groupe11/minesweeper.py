@@ -1,6 +1,13 @@
 import pygame
+import os
+import copy
+import queue
 import random
 import math
+import argparse
+import threading
+import numpy as np
+from functools import lru_cache
 # On utilise OR-Tools de Google pour résoudre les contraintes (moteur de l'IA)
 from ortools.sat.python import cp_model
 
@@ -28,337 +35,999 @@ CELL_SIZE = 40
 MARGIN = 5
 TOOLBAR_HEIGHT = 100
 
+# Niveaux du menu (size = colonnes, lignes)
+LEVELS = {
+    "Débutant": {"size": (9, 9), "mines": 10},
+    "Intermédiaire": {"size": (16, 16), "mines": 40},
+    "Expert": {"size": (30, 15), "mines": 99}
+}
+
 
 # --- LOGIQUE DU JEU ---
+# Les 8 voisins (haut, bas, diago...), dans l'ordre des colonnes de neighbor_table
+NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1),
+                    (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+@lru_cache(maxsize=4)
+def neighbor_table(rows, cols):
+    # table[i] = indices (r * cols + c) des voisins de la case i, -1 hors de la grille.
+    # Calculée une fois par taille de grille et partagée entre les parties
+    rr, cc = np.divmod(np.arange(rows * cols), cols)
+    table = np.full((rows * cols, len(NEIGHBOR_OFFSETS)), -1, dtype=np.int32)
+    for k, (dr, dc) in enumerate(NEIGHBOR_OFFSETS):
+        nr, nc = rr + dr, cc + dc
+        inside = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+        table[inside, k] = nr[inside] * cols + nc[inside]
+    table.flags.writeable = False
+    return table
+
+
 class MinesweeperGame:
-    def __init__(self, rows, cols, mines):
+    # rng : générateur aléatoire (random.Random(seed) pour rejouer une partie), le module random par défaut
+    # no_guess : grille résoluble sans hasard, prise dans `pool` (BoardPool) si fourni, sinon générée
+    def __init__(self, rows, cols, mines, rng=None, no_guess=False, pool=None):
+        self.rng = rng if rng is not None else random
         self.rows = rows
         self.cols = cols
         self.total_mines = mines
-        self.grid = [[0 for _ in range(cols)] for _ in range(rows)]
-        self.visible = [[False for _ in range(cols)] for _ in range(rows)]
-        self.flags = [[False for _ in range(cols)] for _ in range(rows)]
+        # grid : -1 = mine, sinon nombre de mines voisines
+        self.grid = np.zeros((rows, cols), dtype=np.int8)
+        self.visible = np.zeros((rows, cols), dtype=bool)
+        self.flags = np.zeros((rows, cols), dtype=bool)
+        # Ce que voit l'IA, tenu à jour à chaque coup : -2 = drapeau, -1 = inconnu, >=0 = chiffre révélé
+        self.view = np.full((rows, cols), -1, dtype=np.int8)
+        self.revealed = 0
+        self.neighbors = neighbor_table(rows, cols)
         self.game_over = False
         self.win = False
         self.first_click = True
+        # Incrémenté à chaque changement de la grille (sert à jeter les calculs de l'IA devenus obsolètes)
+        self.version = 0
+        if no_guess:
+            self._start_no_guess(pool)
+
+    # Mode sans hasard : la grille est tirée d'avance et sa case de départ est déjà ouverte
+    def _start_no_guess(self, pool):
+        if pool is not None:
+            board = pool.take(self.rows, self.cols, self.total_mines, self.rng)
+        else:
+            board = generate_board(self.rows, self.cols, self.total_mines, self.rng)
+        if board is None:
+            print("Pas de grille sans hasard pour ces dimensions : grille aléatoire.")
+            return
+        layout, start = board
+        self.grid = mine_numbers(layout)
+        self.first_click = False
+        self.reveal(*start)
 
     # On génère la grille seulement après le premier clic pour être sûr de pas tomber sur une mine direct
     def _generate_grid(self, exclude_r=None, exclude_c=None):
-        count = 0
-        while count < self.total_mines:
-            r, c = random.randint(
-                0, self.rows - 1), random.randint(0, self.cols - 1)
-            # On vérifie qu'il n'y a pas déjà une mine et qu'on n'est pas sur la case de départ
-            if self.grid[r][c] != -1 and not (r == exclude_r and c == exclude_c):
-                self.grid[r][c] = -1
-                count += 1
-
-        # On calcule les chiffres pour chaque case (nombre de mines voisines)
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid[r][c] == -1:
-                    continue
-                self.grid[r][c] = sum(1 for nr, nc in self._get_neighbors(r, c)
-                                      if self.grid[nr][nc] == -1)
-
-    # Petit utilitaire pour chopper les 8 cases autour (haut, bas, diago...)
-    def _get_neighbors(self, r, c):
-        offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1),
-                   (0, 1), (1, -1), (1, 0), (1, 1)]
-        neighbors = []
-        for dr, dc in offsets:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                neighbors.append((nr, nc))
-        return neighbors
+        # Tirage des mines parmi toutes les cases sauf celle de départ
+        n_cells = self.rows * self.cols
+        start = exclude_r * self.cols + exclude_c if exclude_r is not None else n_cells
+        picked = np.array(self.rng.sample(range(n_cells - (start < n_cells)), self.total_mines), dtype=np.int64)
+        picked[picked >= start] += 1
+        mines = np.zeros(n_cells, dtype=bool)
+        mines[picked] = True
+        mines = mines.reshape(self.rows, self.cols)
+
+        self.grid = mine_numbers(mines)
 
     # Action de cliquer sur une case
     def reveal(self, r, c):
         if not (0 <= r < self.rows and 0 <= c < self.cols):
             return
         # Si c'est déjà visible, flaggé ou fini, on fait rien
-        if self.visible[r][c] or self.flags[r][c] or self.game_over:
+        if self.visible[r, c] or self.flags[r, c] or self.game_over:
             return
 
         if self.first_click:
             self._generate_grid(exclude_r=r, exclude_c=c)
             self.first_click = False
+        self.version += 1
 
-        self.visible[r][c] = True
-
-        if self.grid[r][c] == -1:
+        if self.grid[r, c] == -1:
             # une mine -> Perdu
+            self.visible[r, c] = True
+            self.view[r, c] = -1
             self.game_over = True
             self.win = False
         else:
-            # Si c'est un 0 (pas de mine autour), on ouvre tout autour récursivement (flood fill)
-            if self.grid[r][c] == 0:
-                for nr, nc in self._get_neighbors(r, c):
-                    self.reveal(nr, nc)
+            self._flood_fill(r * self.cols + c)
             self._check_victory()
 
-    # On vérifie si toutes les cases sans mines sont ouvertes
+    # Ouvre la case i et, si c'est un 0, toute sa zone de 0 et leur bordure, sans récursion :
+    # chaque vague ouvre d'un coup tous les voisins des 0 ouverts à la vague précédente
+    def _flood_fill(self, i):
+        grid, visible = self.grid.reshape(-1), self.visible.reshape(-1)
+        if grid[i] != 0:
+            visible[i] = True
+            self.view.reshape(-1)[i] = grid[i]
+            self.revealed += 1
+            return
+        hidden = ~visible & ~self.flags.reshape(-1)
+        # slot[j] : position de j dans sa vague, pour dédoublonner sans trier
+        slot = np.empty(len(grid), dtype=np.int64)
+        opened = [np.array([i])]
+        hidden[i] = False
+        wave = opened[0][grid[opened[0]] == 0]
+        while wave.size:
+            cells = self.neighbors[wave].ravel()
+            cells = cells[hidden[cells] & (cells >= 0)]
+            order = np.arange(len(cells))
+            slot[cells] = order
+            cells = cells[slot[cells] == order]
+            hidden[cells] = False
+            opened.append(cells)
+            wave = cells[grid[cells] == 0]
+        opened = np.concatenate(opened)
+        visible[opened] = True
+        self.view.reshape(-1)[opened] = grid[opened]
+        self.revealed += len(opened)
+
+    # On vérifie si toutes les cases sans mines sont ouvertes (compteur tenu à jour par reveal)
     def _check_victory(self):
-        count_visible = sum(row.count(True) for row in self.visible)
         total_safe_cells = (self.rows * self.cols) - self.total_mines
 
-        if count_visible == total_safe_cells:
+        if self.revealed == total_safe_cells:
             self.win = True
             self.game_over = True
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    if self.grid[r][c] == -1:
-                        self.flags[r][c] = True
+            self.flags |= self.grid == -1
+            self.view[self.flags & ~self.visible] = -2
 
     def toggle_flag(self, r, c):
-        if not self.visible[r][c] and not self.game_over:
-            self.flags[r][c] = not self.flags[r][c]
-
-    # -2 = drapeau, -1 = inconnu, >=0 = chiffre révélé
+        if not self.visible[r, c] and not self.game_over:
+            self.flags[r, c] = not self.flags[r, c]
+            self.view[r, c] = -2 if self.flags[r, c] else -1
+            self.version += 1
+
+    # Applique les coups de l'IA (les drapeaux déjà posés ne sont pas retirés)
+    def apply_moves(self, moves):
+        for (r, c, action) in moves:
+            if action == 'REVEAL':
+                self.reveal(r, c)
+            elif action == 'FLAG' and not self.flags[r, c]:
+                self.toggle_flag(r, c)
+
+    # Copie de l'état visible de la partie (la grille des mines n'est jamais modifiée, elle est partagée)
+    def snapshot(self):
+        state = copy.copy(self)
+        state.visible = self.visible.copy()
+        state.flags = self.flags.copy()
+        state.view = self.view.copy()
+        return state
+
+    # -2 = drapeau, -1 = inconnu, >=0 = chiffre révélé.
+    # Vue en lecture seule sur self.view (pas de copie) : elle suit la partie
     def get_view_for_ai(self):
-        ai_grid = [[-2 for _ in range(self.cols)] for _ in range(self.rows)]
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.visible[r][c]:
-                    ai_grid[r][c] = self.grid[r][c]
-                elif self.flags[r][c]:
-                    ai_grid[r][c] = -2
+        view = self.view.view()
+        view.flags.writeable = False
+        return view
+
+
+# --- DÉDUCTION RAPIDE (NumPy, sans CP-SAT) ---
+# Les 9 cases d'une fenêtre 3x3, le bit k d'un masque correspond à WINDOW[k]
+WINDOW = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+# Nombre de bits à 1 pour chaque masque de 9 bits
+POPCOUNT = np.array([bin(m).count("1") for m in range(512)], dtype=np.int16)
+# Décalages (dr, dc) de q par rapport à p pour deux chiffres dont les fenêtres se chevauchent,
+# avec les bits de la fenêtre de q qui tombent dans celle de p, et inversement
+PAIRS = [
+    (dr, dc,
+     sum(1 << k for k, (r, c) in enumerate(WINDOW) if (r + dr, c + dc) in WINDOW),
+     sum(1 << k for k, (r, c) in enumerate(WINDOW) if (r - dr, c - dc) in WINDOW))
+    for dr in range(-2, 3) for dc in range(-2, 3) if (dr, dc) != (0, 0)
+]
+
+
+def _shift(a, dr, dc, fill=0):
+    # out[r][c] = a[r + dr][c + dc] (fill si on sort de la grille)
+    rows, cols = a.shape
+    out = np.full_like(a, fill)
+    out[max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)] = \
+        a[max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)]
+    return out
+
+
+def _window_sum(a):
+    # Somme sur la fenêtre 3x3 autour de chaque case (la case elle-même comprise)
+    total = np.zeros(a.shape, dtype=np.int16)
+    for dr, dc in WINDOW:
+        total += _shift(a, dr, dc)
+    return total
+
+
+def _window_mask(a):
+    # Masque 9 bits des cases de la fenêtre 3x3 où `a` est vrai
+    mask = np.zeros(a.shape, dtype=np.int16)
+    for k, (dr, dc) in enumerate(WINDOW):
+        mask |= _shift(a, dr, dc).astype(np.int16) << k
+    return mask
+
+
+def _spread(masks):
+    # Inverse de _window_mask : les cases désignées par les masques 9 bits de leurs voisins
+    out = np.zeros(masks.shape, dtype=bool)
+    for k, (dr, dc) in enumerate(WINDOW):
+        out |= _shift(((masks >> k) & 1).astype(bool), -dr, -dc)
+    return out
+
+
+def mine_numbers(mines):
+    # Les chiffres (nombre de mines voisines) par convolution 3x3 sur toute la grille, -1 pour les mines
+    return np.where(mines, -1, _window_sum(mines)).astype(np.int8)
+
+
+def deduce(view):
+    """
+    Coups sûrs trouvés sans solveur, sur la vue de l'IA (-2 drapeau, -1 inconnu, >=0 chiffre).
+    Les drapeaux sont traités comme des cases inconnues (ils peuvent venir du joueur),
+    comme dans le modèle CP-SAT.
+
+    - règle simple : chiffre restant = 0 -> voisins sûrs ; chiffre restant = nb de voisins -> mines
+    - règle d'inclusion : si les voisins de A sont inclus dans ceux de B, la différence
+      contient (reste B - reste A) mines
+
+    Retourne deux tableaux booléens (sûres, mines).
+    """
+    view = np.asarray(view)
+    numbered = view >= 0
+    hidden = view < 0
+    safe = np.zeros(view.shape, dtype=bool)
+    mine = np.zeros(view.shape, dtype=bool)
+
+    changed = True
+    while changed:
+        undecided = hidden & ~safe & ~mine
+        remaining = np.where(numbered, view - _window_sum(mine), 0)
+        unknown_count = np.where(numbered, _window_sum(undecided), 0)
+        active = numbered & (unknown_count > 0)
+
+        # Règle simple
+        new_safe = _spread(np.where(active & (remaining == 0), _window_mask(undecided), 0))
+        new_mine = _spread(np.where(active & (remaining == unknown_count), _window_mask(undecided), 0))
+
+        # Règle d'inclusion entre chiffres voisins (p inclut q)
+        if not (new_safe.any() or new_mine.any()):
+            masks = np.where(active, _window_mask(undecided), 0)
+            # Les différences sont toutes des masques de la fenêtre de p : on les cumule et on
+            # ne les étale sur la grille qu'une fois à la fin
+            safe_masks = np.zeros_like(masks)
+            mine_masks = np.zeros_like(masks)
+            for dr, dc, q_in_p, p_in_q in PAIRS:
+                mask_q = _shift(masks, dr, dc)
+                rem_q = _shift(remaining, dr, dc)
+                subset = active & (mask_q != 0) & ((mask_q & ~q_in_p) == 0)
+                diff = masks & ~p_in_q
+                diff_mines = remaining - rem_q
+                safe_masks |= np.where(subset & (diff_mines == 0), diff, 0)
+                mine_masks |= np.where(subset & (diff_mines == POPCOUNT[diff]), diff, 0)
+            new_safe |= _spread(safe_masks)
+            new_mine |= _spread(mine_masks)
+
+        new_safe &= undecided
+        new_mine &= undecided
+        changed = bool(new_safe.any() or new_mine.any())
+        safe |= new_safe
+        mine |= new_mine
+
+    return safe, mine
+
+
+# --- PROBABILITÉS EXACTES (comptage par nombre de mines) ---
+# Une composante est parcourue case par case. L'état est ce qu'il reste à placer dans les
+# contraintes "ouvertes" (commencées mais pas finies) : toutes les affectations qui mènent au
+# même état sont regroupées (programmation dynamique sur une décomposition en chemin), donc
+# le coût dépend de la largeur de la composante et plus de sa taille.
+
+def _sweep_width(order, constraints):
+    # Nombre maximal de contraintes ouvertes en même temps pour cet ordre de parcours
+    pos = {u: i for i, u in enumerate(order)}
+    events = [0] * (len(order) + 1)
+    for cells, _ in constraints:
+        idx = [pos[u] for u in cells]
+        events[min(idx) + 1] += 1
+        events[max(idx) + 1] -= 1
+    width = current = 0
+    for e in events:
+        current += e
+        width = max(width, current)
+    return width
+
+
+def _sweep_order(cells, constraints):
+    # On garde le plus étroit des parcours ligne par ligne, colonne par colonne, ou en largeur
+    by_cell = {u: [] for u in cells}
+    for lst, _ in constraints:
+        for u in lst:
+            by_cell[u].append(lst)
+    start = min(cells)
+    bfs, seen = [start], {start}
+    for u in bfs:
+        for lst in by_cell[u]:
+            for v in sorted(lst):
+                if v not in seen:
+                    seen.add(v)
+                    bfs.append(v)
+    orders = [sorted(cells), sorted(cells, key=lambda u: (u[1], u[0])), bfs]
+    return min(orders, key=lambda order: _sweep_width(order, constraints))
+
+
+def _normalized(a):
+    # Les comptes ne servent qu'en rapports : on les ramène à un max de 1 (pas de débordement)
+    top = a.max() if a.size else 0
+    return a / top if top > 0 else a
+
+
+class ComponentCounter:
+    """
+    Solutions d'une composante de la frontière comptées par nombre de mines.
+    `totals[k]` est proportionnel au nombre de solutions à k mines (k <= max_mines),
+    tout à zéro si la composante n'a pas de solution.
+    """
+
+    def __init__(self, cells, constraints, max_mines):
+        self.order = _sweep_order(cells, constraints)
+        n = len(self.order)
+        pos = {u: i for i, u in enumerate(self.order)}
+        self.width = min(n, max_mines) + 1
+
+        idx = [sorted(pos[u] for u in lst) for lst, _ in constraints]
+        values = [val for _, val in constraints]
+        starting = [[] for _ in range(n)]
+        touching = [[] for _ in range(n)]   # (contrainte, cases restantes après celle-ci)
+        opened = [[] for _ in range(n + 1)]  # contraintes ouvertes avant la case i
+        for k, lst in enumerate(idx):
+            starting[lst[0]].append(k)
+            for j, i in enumerate(lst):
+                touching[i].append((k, len(lst) - j - 1))
+            for i in range(lst[0] + 1, lst[-1] + 1):
+                opened[i].append(k)
+
+        # F[i][état, k] : affectations des i premières cases avec k mines menant à l'état
+        # trans[i] : état suivant pour la case i à 0 et à 1 (-1 = contrainte violée)
+        first = np.zeros((1, self.width))
+        first[0, 0] = 1.0
+        self.F, self.trans = [first], []
+        states = [()]
+        for i in range(n):
+            nxt, to0, to1 = {}, [], []
+            for state in states:
+                need = dict(zip(opened[i], state))
+                for k in starting[i]:
+                    need[k] = values[k]
+                for v, out in ((0, to0), (1, to1)):
+                    left = dict(need)
+                    for k, rem in touching[i]:
+                        left[k] -= v
+                        if not 0 <= left[k] <= rem:
+                            out.append(-1)
+                            break
+                    else:
+                        out.append(nxt.setdefault(tuple(left[k] for k in opened[i + 1]), len(nxt)))
+            t0, t1 = np.array(to0), np.array(to1)
+            f = self.F[-1]
+            nf = np.zeros((len(nxt), self.width))
+            ok = t0 >= 0
+            np.add.at(nf, t0[ok], f[ok])
+            ok = t1 >= 0
+            np.add.at(nf[:, 1:], t1[ok], f[ok, :-1])
+            self.F.append(_normalized(nf))
+            self.trans.append((t0, t1))
+            states = list(nxt)
+            if not states:
+                break
+
+        complete = len(self.trans) == n and len(self.F[-1])
+        self.totals = self.F[-1][0] if complete else np.zeros(self.width)
+
+    def marginals(self, weights):
+        """
+        {case: P(mine)} quand une solution à k mines pèse weights[k]
+        (le poids vient des autres composantes et des cases intérieures).
+        """
+        b = _normalized(np.asarray(weights, dtype=np.float64)[None, :])
+        probs = {}
+        # Parcours arrière : b[état, a] = poids des fins possibles sachant a mines déjà posées
+        for i in range(len(self.order) - 1, -1, -1):
+            t0, t1 = self.trans[i]
+            zero = np.zeros((len(t0), self.width))
+            one = np.zeros((len(t0), self.width))
+            zero[t0 >= 0] = b[t0[t0 >= 0]]
+            one[t1 >= 0, :-1] = b[t1[t1 >= 0], 1:]
+            f = self.F[i]
+            both = zero + one
+            den = (f * both).sum()
+            probs[self.order[i]] = float((f * one).sum() / den) if den > 0 else 0.0
+            b = _normalized(both)
+        return probs
+
+
+def mine_probabilities(components, n_interior, total_mines, counters=None):
+    """
+    Probabilités exactes d'être une mine, toutes les grilles cohérentes avec la vue et le
+    nombre total de mines étant équiprobables. Une affectation de la frontière à u mines
+    pèse C(n_interior, total_mines - u) : les composantes sont combinées par convolution
+    de leurs comptes, pondérée par ces coefficients binomiaux.
+
+    `counters` : ComponentCounter déjà calculés pour ces composantes (mémo du solveur), sinon calculés ici.
+
+    Retourne ({case de la frontière: p}, p d'une case intérieure ou None s'il n'y en a pas),
+    ou None si aucune grille n'est cohérente.
+    """
+    if counters is None:
+        counters = [ComponentCounter(cells, cons, total_mines) for cells, cons in components]
+    if any(not counter.totals.any() for counter in counters):
+        return None
+
+    # g[u] ~ C(n_interior, total_mines - u), calculé en log (les coefficients sont énormes)
+    j = np.arange(1, min(total_mines, n_interior) + 1)
+    log_comb = np.concatenate(([0.0], np.cumsum(np.log(n_interior - j + 1) - np.log(j))))
+    log_g = np.full(total_mines + 1, -np.inf)
+    u = np.arange(total_mines - len(log_comb) + 1, total_mines + 1)
+    log_g[u] = log_comb[total_mines - u]
+    g = np.exp(log_g - log_g.max())
+
+    # Convolution des comptes : préfixes et suffixes pour exclure chaque composante à son tour
+    def conv(a, b):
+        return _normalized(np.convolve(a, b)[:total_mines + 1])
+
+    prefix = [np.ones(1)]
+    for counter in counters:
+        prefix.append(conv(prefix[-1], counter.totals))
+    suffix = [np.ones(1)]
+    for counter in reversed(counters):
+        suffix.append(conv(suffix[-1], counter.totals))
+    suffix.reverse()
+
+    weighted = prefix[-1] * g[:len(prefix[-1])]
+    if weighted.sum() <= 0:
+        return None
+
+    probs = {}
+    for i, counter in enumerate(counters):
+        others = conv(prefix[i], suffix[i + 1])
+        # weights[a] = somme sur j de others[j] * g[a + j]
+        weights = np.convolve(g, others[::-1])[len(others) - 1:][:counter.width]
+        probs.update(counter.marginals(np.pad(weights, (0, counter.width - len(weights)))))
+
+    interior = None
+    if n_interior:
+        frontier_mines = np.arange(len(weighted))
+        interior = float((weighted * (total_mines - frontier_mines)).sum() / (weighted.sum() * n_interior))
+    return probs, interior
+
+
+# --- GRILLES SANS HASARD (résolubles par la seule logique) ---
+# Nombre de mines déplacées par réparation, réparations avant de retirer toute la grille, tirages
+REPAIR_MOVES = 2
+MAX_REPAIRS = 200
+MAX_RESTARTS = 20
+
+
+def logic_solve(grid, start, total_mines, trial=None):
+    """
+    Joue la grille depuis la case `start` avec la seule déduction rapide, plus le nombre total
+    de mines (plus de mines à trouver -> tout le reste est sûr).
+    Retourne (partie d'essai, mines déduites) : trial.win si aucune case n'a dû être devinée.
+    `trial` : partie d'essai précédente à reprendre là où elle s'était arrêtée, sur la grille modifiée.
+    """
+    rows, cols = grid.shape
+    if trial is None:
+        trial = MinesweeperGame(rows, cols, total_mines)
+        trial.grid = grid
+        trial.first_click = False
+        trial.reveal(*start)
+    else:
+        trial.grid = grid
+        trial.view[trial.visible] = grid[trial.visible]
+    mine = np.zeros(grid.shape, dtype=bool)
+    while not trial.game_over:
+        safe, mine = deduce(trial.view)
+        if total_mines == int(mine.sum()):
+            safe |= ~trial.visible & ~mine
+        if not safe.any():
+            break
+        for r, c in np.argwhere(safe).tolist():
+            trial.reveal(r, c)
+    return trial, mine
+
+
+def generate_no_guess(rows, cols, mines, start, rng):
+    """
+    Mines (tableau booléen) d'une grille que la déduction résout depuis `start`, ou None.
+    La case de départ et ses voisins sont libres (le premier clic ouvre une zone).
+
+    Quand la logique bloque, la grille n'est pas retirée : quelques mines de la zone bloquée
+    (cases cachées non déduites au bord de la zone ouverte) sont déplacées vers des cases
+    cachées loin de cette zone, et la résolution reprend là où elle s'était arrêtée.
+    Une grille ainsi réparée est revérifiée depuis le départ avant d'être acceptée.
+    """
+    r0, c0 = start
+    zone = np.zeros((rows, cols), dtype=bool)
+    zone[max(0, r0 - 1):r0 + 2, max(0, c0 - 1):c0 + 2] = True
+    allowed = np.flatnonzero(~zone)
+    if mines > len(allowed):
+        return None
+
+    for _ in range(MAX_RESTARTS):
+        layout = np.zeros(rows * cols, dtype=bool)
+        layout[allowed[rng.sample(range(len(allowed)), mines)]] = True
+        layout = layout.reshape(rows, cols)
+        trial, resumed = None, False
+        for _ in range(MAX_REPAIRS):
+            trial, known = logic_solve(mine_numbers(layout), start, mines, trial)
+            if trial.win and resumed:
+                # Des chiffres déjà ouverts ont pu changer depuis leur déduction : on revérifie
+                trial, known = logic_solve(mine_numbers(layout), start, mines)
+            if trial.win:
+                return layout
+            stuck = ~trial.visible & ~known
+            near = stuck & (_window_sum(trial.visible) > 0)
+            sources = np.flatnonzero(near & layout)
+            if not len(sources):
+                sources = np.flatnonzero(stuck & layout)
+            targets = np.flatnonzero(stuck & ~near & ~layout & ~zone)
+            resumed = bool(len(targets))
+            if not resumed:
+                # Plus de place loin de la zone bloquée (fin de grille, 50/50) : n'importe quelle case libre
+                # hors de cette zone, y compris déjà ouverte (la résolution repart alors du début)
+                targets = np.flatnonzero(~stuck & ~layout & ~zone)
+            moves = min(REPAIR_MOVES, len(sources), len(targets))
+            if not moves:
+                break
+            flat = layout.reshape(-1)
+            flat[rng.sample(list(sources), moves)] = False
+            flat[rng.sample(list(targets), moves)] = True
+            if not resumed:
+                trial = None
+    return None
+
+
+def generate_board(rows, cols, mines, rng):
+    # Grille sans hasard avec une case de départ tirée au hasard : (mines, (ligne, colonne)) ou None
+    start = (rng.randrange(rows), rng.randrange(cols))
+    layout = generate_no_guess(rows, cols, mines, start, rng)
+    return None if layout is None else (layout, start)
+
+
+# Grilles gardées d'avance par taille, et fichier des grilles pré-générées (--pregenerate)
+POOL_SIZE = 5
+BOARDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "boards.npz")
+
+
+class BoardPool:
+    """
+    Grilles sans hasard prêtes à jouer, par taille (lignes, colonnes, mines) : (mines, case de départ).
+    keep_filled() lance un thread qui garde POOL_SIZE grilles d'avance pour chaque taille demandée,
+    save() / load() les conservent d'une session à l'autre.
+    """
+
+    def __init__(self):
+        self.boards = {}
+        self._targets = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def take(self, rows, cols, mines, rng=random):
+        # Une grille du pool si possible (démarrage immédiat), sinon générée sur place
+        with self._cond:
+            boards = self.boards.get((rows, cols, mines))
+            board = boards.pop() if boards else None
+            self._cond.notify()
+        return board if board is not None else generate_board(rows, cols, mines, rng)
+
+    def fill(self, rows, cols, mines, count, rng=random):
+        for _ in range(count):
+            board = generate_board(rows, cols, mines, rng)
+            if board is None:
+                return
+            with self._cond:
+                self.boards.setdefault((rows, cols, mines), []).append(board)
+
+    def keep_filled(self, sizes, target=POOL_SIZE):
+        with self._cond:
+            self._targets.update({size: target for size in sizes})
+            self._cond.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._fill_loop, daemon=True)
+            self._thread.start()
+
+    def _fill_loop(self):
+        rng = random.Random()
+        while True:
+            with self._cond:
+                missing = [size for size, target in self._targets.items()
+                           if len(self.boards.get(size, ())) < target]
+                if not missing:
+                    self._cond.wait()
+                    continue
+                size = min(missing, key=lambda k: len(self.boards.get(k, ())))
+            board = generate_board(*size, rng)
+            with self._cond:
+                if board is None:
+                    # Aucune grille sans hasard pour cette taille (trop de mines)
+                    self._targets.pop(size, None)
                 else:
-                    ai_grid[r][c] = -1
-        return ai_grid
+                    self.boards.setdefault(size, []).append(board)
+
+    def save(self, path=BOARDS_FILE):
+        arrays = {}
+        with self._cond:
+            for (rows, cols, mines), boards in self.boards.items():
+                if boards:
+                    key = f"{rows}x{cols}x{mines}"
+                    arrays[key + "_mines"] = np.packbits(np.array([b[0].reshape(-1) for b in boards]), axis=1)
+                    arrays[key + "_starts"] = np.array([b[1] for b in boards], dtype=np.int32)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    def load(self, path=BOARDS_FILE):
+        if not os.path.exists(path):
+            return
+        with np.load(path) as data:
+            for name in data.files:
+                if not name.endswith("_mines"):
+                    continue
+                key = name[:-len("_mines")]
+                rows, cols, mines = map(int, key.split("x"))
+                layouts = np.unpackbits(data[name], axis=1, count=rows * cols).astype(bool)
+                boards = [(layout.reshape(rows, cols), tuple(int(v) for v in start))
+                          for layout, start in zip(layouts, data[key + "_starts"])]
+                random.shuffle(boards)
+                with self._cond:
+                    self.boards.setdefault((rows, cols, mines), []).extend(boards)
+
+
+BOARD_POOL = BoardPool()
+
+
+# --- FRONTIÈRE INCRÉMENTALE ---
+class Frontier:
+    """
+    Contraintes de la frontière (chiffres qui touchent une case cachée) et leurs composantes
+    connexes, gardées d'un coup à l'autre. update() compare la vue à la précédente : seuls les
+    chiffres autour des cases qui ont changé sont relus, et seules les composantes qui les
+    contiennent sont recalculées. Les drapeaux restent des inconnues (ils peuvent venir du joueur).
+
+    Chaque composante a une clé canonique (ses contraintes triées) : tant qu'elle ne change pas,
+    le solveur réutilise ce qu'il a calculé dessus.
+    """
+
+    def __init__(self):
+        self.view = None
+        self.constraints = {}  # index du chiffre -> (cases cachées voisines, valeur)
+        self.by_cell = {}      # case cachée -> indices des chiffres qui la touchent
+        self.comp_of = {}      # index du chiffre -> composante (frozenset d'indices)
+        self.components = {}   # composante -> (clé, cases, contraintes)
+
+    def update(self, view):
+        """Composantes de la vue : [(clé, cases, [(cases, valeur)])], triées par première case."""
+        rows, cols = view.shape
+        flat = view.ravel()
+        table = neighbor_table(rows, cols)
+        if self.view is None or self.view.shape != flat.shape:
+            self.__init__()
+            touched = np.flatnonzero((view >= 0) & (_window_sum(view < 0) > 0))
+        else:
+            changed = np.flatnonzero(flat != self.view)
+            # Une case qui change modifie sa propre contrainte et celles de ses voisins
+            touched = np.unique(np.concatenate((changed, table[changed].ravel())))
+            touched = touched[touched >= 0]
+        self.view = flat.copy()
+
+        dirty = set()
+        for i in touched.tolist():
+            old = self.constraints.pop(i, None)
+            if old is not None:
+                comp = self.comp_of.pop(i)
+                if self.components.pop(comp, None) is not None:
+                    dirty |= comp
+                for u in old[0]:
+                    self.by_cell[u].discard(i)
+                    if not self.by_cell[u]:
+                        del self.by_cell[u]
+            if flat[i] >= 0:
+                cells = tuple(divmod(j, cols) for j in table[i].tolist() if j >= 0 and flat[j] < 0)
+                if cells:
+                    self.constraints[i] = (cells, int(flat[i]))
+                    for u in cells:
+                        self.by_cell.setdefault(u, set()).add(i)
+                    dirty.add(i)
+
+        # Parcours depuis les chiffres touchés : les composantes intactes ne sont pas revisitées
+        todo = {i for i in dirty if i in self.constraints}
+        while todo:
+            stack = [todo.pop()]
+            comp = set(stack)
+            while stack:
+                for u in self.constraints[stack.pop()][0]:
+                    for j in self.by_cell[u]:
+                        if j not in comp:
+                            comp.add(j)
+                            stack.append(j)
+            todo -= comp
+            comp = frozenset(comp)
+            for j in comp:
+                old = self.comp_of.get(j)
+                if old is not None and old != comp:
+                    # Composante intacte absorbée par une nouvelle contrainte
+                    self.components.pop(old, None)
+                self.comp_of[j] = comp
+            constraints = sorted(self.constraints[j] for j in comp)
+            cells = sorted({u for lst, _ in constraints for u in lst})
+            self.components[comp] = (tuple(constraints), cells, [(list(lst), val) for lst, val in constraints])
+
+        return sorted(self.components.values(), key=lambda c: c[1][0])
 
 
 # --- CONFIGURATION DE L'IA ---
 class CSPSolver:
-    def __init__(self, game):
+    # verbose=False : pas de print à chaque coup (parties sans affichage, benchmark)
+    def __init__(self, game, verbose=True):
         self.game = game
+        self.verbose = verbose
         self.last_probabilities = []
-
-    # On prépare le problème pour le solveur CP-SAT
-    def _create_model(self, grid_view):
+        self.interior_probability = None
+        # Nombre de résolutions CP-SAT et de coups au hasard (hors premier clic) depuis le début de la partie,
+        # et composantes reprises du mémo sans recalcul
+        self.stats = {"cp_sat_calls": 0, "guesses": 0, "memo_hits": 0}
+        # Avancement du calcul en cours (lu par l'affichage pendant que l'IA tourne dans un thread)
+        self.progress = {"stage": "", "component": 0, "components": 0, "decided": 0}
+        # threading.Event posé par AIWorker : le calcul s'arrête dès qu'il est levé
+        self.cancel = None
+        # Frontière tenue à jour d'un coup à l'autre, et résultats par clé de composante :
+        # coups trouvés par CP-SAT et comptes de solutions (ComponentCounter)
+        self.frontier = Frontier()
+        self._probed = {}
+        self._counters = {}
+
+    def _cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    # Contraintes (cases cachées voisines, chiffre) regroupées par composante connexe de la frontière,
+    # mises à jour seulement là où la grille a changé (cf. Frontier). Les résultats des composantes
+    # disparues sont oubliés
+    def _frontier_components(self, grid_view):
+        components = self.frontier.update(grid_view)
+        keys = {key for key, _, _ in components}
+        self._probed = {key: moves for key, moves in self._probed.items() if key in keys}
+        self._counters = {key: c for key, c in self._counters.items() if key[0] in keys}
+        return components
+
+    # Un seul modèle CP-SAT par composante : Somme des voisins cachés = Valeur de la case
+    def _create_model(self, cells, constraints):
         model = cp_model.CpModel()
-        vars = {}
-        rows, cols = len(grid_view), len(grid_view[0])
-        unknowns = set()
-        open_numbered = []
-
-        # On repère les cases inconnues qui touchent des chiffres
-        for r in range(rows):
-            for c in range(cols):
-                if grid_view[r][c] >= 0:
-                    open_numbered.append((r, c))
-                    for nr, nc in self.game._get_neighbors(r, c):
-                        if not self.game.visible[nr][nc]:
-                            unknowns.add((nr, nc))
-
-        # On crée une variable booléenne (0 ou 1) pour chaque case inconnue
-        for (r, c) in unknowns:
-            vars[(r, c)] = model.NewBoolVar(f'cell_{r}_{c}')
-
-        # On ajoute les contraintes : Somme des voisins = Valeur de la case
-        for r, c in open_numbered:
-            val = grid_view[r][c]
-            neighbors = self.game._get_neighbors(r, c)
-            current_vars = [vars.get((nr, nc))
-                            for nr, nc in neighbors if (nr, nc) in vars]
-
-            if current_vars:
-                model.Add(sum(current_vars) == val)
-
-        return model, vars, list(unknowns)
+        vars = {(r, c): model.NewBoolVar(f'cell_{r}_{c}') for r, c in cells}
+        for lst, val in constraints:
+            model.Add(sum(vars[u] for u in lst) == val)
+        return model, vars
+
+    # On teste chaque case de la composante avec des hypothèses (assumptions) sur le même modèle.
+    # Chaque solution trouvée est gardée : une case vue à 0 et à 1 est indécidable, sans autre appel
+    def _probe_component(self, cells, constraints):
+        model, vars = self._create_model(cells, constraints)
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 1
+        seen = {u: set() for u in cells}
+
+        def solve(assumption=None):
+            model.ClearAssumptions()
+            if assumption is not None:
+                model.AddAssumptions([assumption])
+            self.stats["cp_sat_calls"] += 1
+            if solver.Solve(model) in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                for u, var in vars.items():
+                    seen[u].add(solver.Value(var))
+                return True
+            return False
+
+        # Grille incohérente (drapeau du joueur faux par ex.) : rien à déduire ici
+        if not solve():
+            return []
+
+        moves = []
+        for u in cells:
+            if self._cancelled():
+                return []
+            if len(seen[u]) == 2:
+                continue
+            value = next(iter(seen[u]))
+            # On essaie la valeur contraire : si c'est impossible, la case est décidée
+            if not solve(vars[u].Not() if value else vars[u]):
+                moves.append((*u, 'FLAG' if value else 'REVEAL'))
+                model.Add(vars[u] == value)
+                self.progress["decided"] += 1
+        return moves
 
     # Fonction principale de l'IA
     def find_safe_moves(self):
         grid_view = self.game.get_view_for_ai()
-        _, _, unknowns = self._create_model(grid_view)
-
-        if not unknowns:
+        self.progress.update(stage="déduction", component=0, components=0, decided=0)
+
+        # 1) Déduction rapide : règles simples et d'inclusion, sans solveur
+        safe, mine = deduce(grid_view)
+        # Les drapeaux déjà posés ne sont pas des coups, et une case marquée par le joueur n'est pas révélée
+        safe &= ~self.game.flags
+        mine &= ~self.game.flags
+        moves = [(int(r), int(c), 'REVEAL') for r, c in zip(*np.nonzero(safe))]
+        moves += [(int(r), int(c), 'FLAG') for r, c in zip(*np.nonzero(mine))]
+        self.progress["decided"] = len(moves)
+        if moves:
+            return moves
+
+        # 2) CP-SAT seulement si les règles simples ne suffisent pas, composante par composante
+        components = self._frontier_components(grid_view)
+
+        if not components:
+            self._count_guess()
             return self._guess_random()
 
-        moves = []
-        solver = cp_model.CpSolver()
-
-        # Pour chaque case inconnue, on teste si elle peut être une mine ou pas
-        for (r, c) in unknowns:
-            # Test 1 : Est-ce qu'il est impossible que ce soit sûr ? (Donc c'est une mine)
-            model_safe, vars_safe, _ = self._create_model(grid_view)
-            model_safe.Add(vars_safe[(r, c)] == 0)  # Supposons que c'est safe
-            if solver.Solve(model_safe) == cp_model.INFEASIBLE:
-                moves.append((r, c, 'FLAG'))  # Si impossible c'est une mine
-                continue
-
-            # Test 2 : Est-ce qu'il est impossible que ce soit une mine ? (Donc c'est safe)
-            model_mine, vars_mine, _ = self._create_model(grid_view)
-            # Supposons que c'est une mine
-            model_mine.Add(vars_mine[(r, c)] == 1)
-            if solver.Solve(model_mine) == cp_model.INFEASIBLE:
-                moves.append((r, c, 'REVEAL'))  # Impossible= sûr
+        self.progress.update(stage="CP-SAT", components=len(components))
+        for i, (key, cells, constraints) in enumerate(components):
+            if self._cancelled():
+                return []
+            self.progress["component"] = i + 1
+            # Composante inchangée depuis son dernier test : même résultat, sans CP-SAT
+            if key in self._probed:
+                self.stats["memo_hits"] += 1
+                self.progress["decided"] += len(self._probed[key])
+            else:
+                found = self._probe_component(cells, constraints)
+                if self._cancelled():
+                    return []
+                self._probed[key] = found
+            moves += self._probed[key]
+
+        # Case marquée : ni nouveau drapeau ni révélation (reveal() ignore les cases marquées)
+        moves = [m for m in moves if not self.game.flags[m[0], m[1]]]
 
         # Si le solveur logique ne trouve rien, on passe aux probabilités
         if not moves:
-            self.last_probabilities = self._compute_probabilities()
-            prob_move = self._choose_safest_from_probs(self.last_probabilities)
+            if self._cancelled():
+                return []
+            self.progress["stage"] = "probabilités"
+            self.last_probabilities = self._compute_probabilities(grid_view, components)
+            prob_move, p = self._choose_safest_from_probs(self.last_probabilities)
+            self._count_guess(p)
             return [prob_move] if prob_move else self._guess_random()
 
         return moves
 
+    # p : probabilité de mine de la case jouée (None = coup au hasard)
+    def _count_guess(self, p=None):
+        # Le premier clic est toujours sûr, ce n'est pas un pari. Une case à P(mine)=0 non plus :
+        # elle n'est sûre qu'avec le nombre total de mines, que CP-SAT ne prend pas en compte
+        if not self.game.first_click and (p is None or p > 0):
+            self.stats["guesses"] += 1
+
     def _guess_random(self):
         # Choix aléatoire quand on commence ou qu'on est perdu
-        choices = [(r, c) for r in range(self.game.rows) for c in range(
-            self.game.cols) if not self.game.visible[r][c] and not self.game.flags[r][c]]
-        return [(*random.choice(choices), 'REVEAL')] if choices else []
-
-    # On sépare les groupes de cases interconnectées et on compte toutes les combinaisons valides
-    def _compute_probabilities(self):
-        grid = self.game.get_view_for_ai()
-        rows, cols = self.game.rows, self.game.cols
-        frontier = set()
-        numbered = []
-
-        # On identifie la frontière (cases inconnues à côté de chiffres)
-        for r in range(rows):
-            for c in range(cols):
-                if grid[r][c] >= 0:
-                    numbered.append((r, c))
-                    for nr, nc in self.game._get_neighbors(r, c):
-                        if not self.game.visible[nr][nc] and not self.game.flags[nr][nc]:
-                            frontier.add((nr, nc))
-        if not frontier:
+        choices = np.flatnonzero(~self.game.visible & ~self.game.flags)
+        if not len(choices):
             return []
+        return [(*divmod(int(self.game.rng.choice(choices)), self.game.cols), 'REVEAL')]
+
+    # Probabilités exactes sur toute la grille : frontière et cases intérieures, avec le nombre total de mines
+    def _compute_probabilities(self, grid_view, components):
+        hidden = int((grid_view < 0).sum())
+        frontier = sum(len(cells) for _, cells, _ in components)
+        counters = []
+        for key, cells, constraints in components:
+            # Les comptes s'arrêtent au nombre total de mines : il fait partie de la clé
+            memo_key = (key, self.game.total_mines)
+            if memo_key in self._counters:
+                self.stats["memo_hits"] += 1
+            else:
+                self._counters[memo_key] = ComponentCounter(cells, constraints, self.game.total_mines)
+            counters.append(self._counters[memo_key])
+        result = mine_probabilities([(cells, cons) for _, cells, cons in components],
+                                    hidden - frontier, self.game.total_mines, counters)
+        if result is None:
+            # Grille incohérente (drapeau du joueur faux par ex.)
+            self.interior_probability = None
+            return []
+        probs, self.interior_probability = result
+        # On trie pour avoir la proba la plus faible en premier (les drapeaux ne sont pas jouables)
+        return sorted(((u, p) for u, p in probs.items() if not self.game.flags[u]),
+                      key=lambda x: x[1])
 
-        # On map les chiffres à leurs voisins inconnus
-        neighbor_to_unknowns = {}
-        for r, c in numbered:
-            if grid[r][c] >= 0:
-                lst = [(nr, nc) for nr, nc in self.game._get_neighbors(
-                    r, c) if (nr, nc) in frontier]
-                if lst:
-                    neighbor_to_unknowns[(r, c)] = lst
-
-        # On construit un graphe pour trouver les composantes connexes
-        adj = {u: set() for u in frontier}
-        for _, unk_list in neighbor_to_unknowns.items():
-            for i in range(len(unk_list)):
-                for j in range(i + 1, len(unk_list)):
-                    adj[unk_list[i]].add(unk_list[j])
-                    adj[unk_list[j]].add(unk_list[i])
-
-        # Parcours pour séparer les groupes indépendants
-        components, seen = [], set()
-        for u in frontier:
-            if u not in seen:
-                comp, stack = [], [u]
-                seen.add(u)
-                while stack:
-                    cur = stack.pop()
-                    comp.append(cur)
-                    for v in adj[cur]:
-                        if v not in seen:
-                            seen.add(v)
-                            stack.append(v)
-                components.append(comp)
-
-        MAX_ENUM_SIZE = 18  # Limite pour éviter que ça explose si trop de cases
-        cell_prob_mine = {u: 0.0 for u in frontier}
-        cell_prob_count = {u: 0 for u in frontier}
-
-        # Fonction locale pour vérifier les contraintes
-        def constraints_for_cells(cells):
-            cons, cell_set = [], set(cells)
-            for (nr, nc), unk_list in neighbor_to_unknowns.items():
-                sub = [x for x in unk_list if x in cell_set]
-                if not sub:
-                    continue
-
-                total_required = grid[nr][nc]
-                flagged = sum(1 for rr, cc in self.game._get_neighbors(
-                    nr, nc) if self.game.flags[rr][cc])
-                cons.append((sub, max(0, total_required-flagged)))
-            return cons
-
-        # Backtracking : on essaie toutes les possibilités (0 ou 1) pour compter celles qui marchent
-        def enumerate_component(cells):
-            cons = constraints_for_cells(cells)
-            n = len(cells)
-            if n == 0 or n > MAX_ENUM_SIZE:
-                return None
-
-            idx_map = {cells[i]: i for i in range(n)}
-            mine_counts, total_assignments = [0] * n, 0
-            cons_idx = [([idx_map[u] for u in unk_list], req)
-                        for unk_list, req in cons]
-            assign, cur_cnt = [0] * n, [0] * len(cons_idx)
-
-            # Vérifie si on peut encore satisfaire les contraintes
-            def feasible(vi, val):
-                for k, (indices, required) in enumerate(cons_idx):
-                    if vi in indices:
-                        new_cnt = cur_cnt[k] + val
-                        remaining_slots = sum(1 for idx in indices if idx > vi)
-                        if new_cnt > required or new_cnt + remaining_slots < required:
-                            return False
-                return True
-
-            def set_vi(vi, val, sign):
-                assign[vi] = val
-                for k, (indices, _) in enumerate(cons_idx):
-                    if vi in indices:
-                        cur_cnt[k] += val * sign
-
-            # Récursion
-            def backtrack(vi=0):
-                nonlocal total_assignments
-                if vi == n:
-                    if all(cur_cnt[k] == req for k, (_, req) in enumerate(cons_idx)):
-                        total_assignments += 1
-                        for i in range(n):
-                            mine_counts[i] += assign[i]
-                    return
-                for val in (0, 1):
-                    if feasible(vi, val):
-                        set_vi(vi, val, 1)
-                        backtrack(vi + 1)
-                        set_vi(vi, val, -1)
-
-            backtrack()
-            # Retourne la probabilité d'avoir une mine
-            return {cells[i]: mine_counts[i] / total_assignments for i in range(n)} if total_assignments > 0 else None
-
-        # On lance le calcul pour chaque groupe
-        for comp in components:
-            probs = enumerate_component(comp)
-            for u in comp:
-                cell_prob_mine[u] += probs.get(u, 0.5) if probs else 0.5
-                cell_prob_count[u] += 1
-
-        # On trie pour avoir la proba la plus faible en premier
-        averaged = sorted([(u, cell_prob_mine[u]/cell_prob_count[u])
-                          for u in frontier if cell_prob_count[u] > 0], key=lambda x: x[1])
-        return averaged
-
+    # Retourne (coup, P(mine)), ou (None, None) s'il n'y a pas de case jouable
     def _choose_safest_from_probs(self, probs):
+        p_inside = self.interior_probability
+        if p_inside is not None and (not probs or p_inside < probs[0][1]):
+            # Une case loin des chiffres est moins risquée que toute la frontière
+            inside = ~self.game.visible & ~self.game.flags
+            for u, _ in self.last_probabilities:
+                inside[u] = False
+            choices = np.flatnonzero(inside)
+            if len(choices):
+                br, bc = divmod(int(self.game.rng.choice(choices)), self.game.cols)
+                if self.verbose:
+                    print(f"IA (proba) joue: REVEAL ({br},{bc}) hors frontière avec P(mine)={p_inside:.3f}")
+                return (br, bc, 'REVEAL'), p_inside
         if not probs:
-            return None
+            return None, None
         # On prend celui avec la proba de mine la plus basse
         (br, bc), p = probs[0]
-        print(f"IA (proba) joue: REVEAL ({br},{bc}) avec P(mine)={p:.3f}")
-        return (br, bc, 'REVEAL')
+        if self.verbose:
+            print(f"IA (proba) joue: REVEAL ({br},{bc}) avec P(mine)={p:.3f}")
+        return (br, bc, 'REVEAL'), p
+
+
+# --- IA EN ARRIÈRE-PLAN ---
+class AIWorker:
+    """
+    Lance find_safe_moves dans un thread, sur une copie de la partie, pour ne pas figer
+    la boucle d'affichage. Le résultat arrive dans `results` : (version de la partie, coups).
+    Un seul calcul à la fois (le solveur garde son état d'une partie à l'autre) :
+    cancel() lève l'Event du calcul en cours, qui s'arrête au prochain point de contrôle.
+    """
+
+    def __init__(self, ai):
+        self.ai = ai
+        self.results = queue.Queue()
+        self.thread = None
+        self._cancel = None
+
+    @property
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def submit(self, game):
+        # Refusé tant que le calcul précédent (même annulé) n'est pas terminé
+        if self.busy:
+            return False
+        self._cancel = threading.Event()
+        self.ai.game = game.snapshot()
+        self.ai.cancel = self._cancel
+        self.thread = threading.Thread(target=self._run, args=(game.version, self._cancel), daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self, version, cancel):
+        try:
+            moves = self.ai.find_safe_moves()
+        except Exception as e:
+            print(f"Erreur de l'IA : {e}")
+            moves = []
+        if not cancel.is_set():
+            self.results.put((version, moves))
+
+    def cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def poll(self):
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
 
 
 # --- FONCTIONS D'AFFICHAGE ---
 
+# Polices et textes rendus gardés en cache : la recherche de police et le rendu ne se font
+# qu'une fois, plus à chaque image
+@lru_cache(maxsize=None)
+def get_font(size, bold=False):
+    name = "segoeui" if "segoeui" in pygame.font.get_fonts() else "arial"
+    return pygame.font.SysFont(name, size, bold)
+
+
+@lru_cache(maxsize=256)
+def text_surface(text, size, color, bold=False):
+    return get_font(size, bold).render(text, True, color)
+
+
 def draw_text(screen, text, size, color, x, y, bold=False):
-    font = pygame.font.SysFont(
-        "segoeui" if "segoeui" in pygame.font.get_fonts() else "arial", size, bold)
-    img = font.render(text, True, color)
+    img = text_surface(text, size, color, bold)
     screen.blit(img, (x - img.get_width() // 2, y - img.get_height() // 2))
 
 
 def draw_text_left(screen, text, size, color, x, y, bold=False):
-    font = pygame.font.SysFont(
-        "segoeui" if "segoeui" in pygame.font.get_fonts() else "arial", size, bold)
-    img = font.render(text, True, color)
-    screen.blit(img, (x, y))
+    screen.blit(text_surface(text, size, color, bold), (x, y))
 
 
 def draw_rounded_rect(screen, color, rect, radius=8):
@@ -383,6 +1052,45 @@ def draw_flag(screen, center_x, center_y, size=14):
     pygame.draw.polygon(screen, FLAG_COLOR, points)
 
 
+# Codes des images de case : cachée, drapeau, révélée (+ chiffre), mine ; + TILE_HOVER si survolée
+TILE_HIDDEN, TILE_FLAG, TILE_EMPTY, TILE_MINE = 0, 1, 2, 11
+TILE_HOVER = 16
+
+
+def _tile(color):
+    tile = pygame.Surface((CELL_SIZE, CELL_SIZE))
+    tile.fill(BG_COLOR)
+    draw_rounded_rect(tile, color, tile.get_rect(), radius=6)
+    return tile
+
+
+@lru_cache(maxsize=1)
+def cell_tiles():
+    # Toutes les images de case, dessinées une seule fois
+    center, size = CELL_SIZE // 2, CELL_SIZE // 3
+    tiles = {}
+    for code, color in ((TILE_HIDDEN, CELL_HIDDEN), (TILE_HIDDEN + TILE_HOVER, CELL_HOVER)):
+        tiles[code] = _tile(color)
+        tiles[code + TILE_FLAG] = _tile(color)
+        draw_flag(tiles[code + TILE_FLAG], center, center, size=size)
+    tiles[TILE_EMPTY] = _tile(CELL_REVEALED)
+    for val in range(1, 9):
+        tiles[TILE_EMPTY + val] = _tile(CELL_REVEALED)
+        draw_text(tiles[TILE_EMPTY + val], str(val), 20, NUMBER_COLORS[val - 1], center, center, bold=True)
+    tiles[TILE_MINE] = _tile(CELL_REVEALED)
+    draw_mine(tiles[TILE_MINE], center, center, size=size)
+    return tiles
+
+
+def cell_codes(game, hover=None):
+    # Code de l'image de chaque case (tableau comparé d'une image à l'autre)
+    codes = np.where(game.visible, np.where(game.grid < 0, TILE_MINE, TILE_EMPTY + game.grid),
+                     np.where(game.flags, TILE_FLAG, TILE_HIDDEN)).astype(np.int8)
+    if hover is not None and not game.visible[hover]:
+        codes[hover] += TILE_HOVER
+    return codes
+
+
 # --- MENU PRINCIPAL ---
 def main_menu():
     pygame.init()
@@ -390,21 +1098,20 @@ def main_menu():
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("Démineur IA - Choix du niveau")
 
-    # Choix du niveau
-    levels = {
-        "Débutant": {"size": (9, 9), "mines": 10},
-        "Intermédiaire": {"size": (16, 16), "mines": 40},
-        "Expert": {"size": (30, 15), "mines": 99}
-    }
-
     # Création des boutons
     buttons = []
     button_y_start = 250
-    for i, (level, config) in enumerate(levels.items()):
+    for i, (level, config) in enumerate(LEVELS.items()):
         rect = pygame.Rect(screen_width // 2 - 150,
                            button_y_start + i * 80, 300, 60)
         buttons.append({"rect": rect, "text": level, "config": config})
 
+    # Mode sans hasard : grilles résolubles par la logique, préparées en fond
+    no_guess = False
+    no_guess_rect = pygame.Rect(screen_width // 2 - 150,
+                                button_y_start + len(LEVELS) * 80 + 10, 300, 44)
+    BOARD_POOL.load()
+
     running = True
     while running:
         screen.fill(BG_COLOR)
@@ -422,6 +1129,9 @@ def main_menu():
             draw_rounded_rect(screen, color, button["rect"])
             draw_text(screen, button["text"], 22, TEXT_LIGHT,
                       button["rect"].centerx, button["rect"].centery, bold=True)
+        draw_rounded_rect(screen, ACCENT_BLUE if no_guess else HEADER_COLOR, no_guess_rect)
+        draw_text(screen, f"Sans hasard : {'oui' if no_guess else 'non'}", 18, TEXT_LIGHT,
+                  no_guess_rect.centerx, no_guess_rect.centery)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -429,11 +1139,16 @@ def main_menu():
             # Si on clique sur un bouton, on lance le jeu
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
+                    if no_guess_rect.collidepoint(mouse_pos):
+                        no_guess = not no_guess
+                        if no_guess:
+                            BOARD_POOL.keep_filled([(config["size"][1], config["size"][0], config["mines"])
+                                                    for config in LEVELS.values()])
                     for button in buttons:
                         if button["rect"].collidepoint(mouse_pos):
                             cols, rows = button["config"]["size"]
                             mines = button["config"]["mines"]
-                            game_loop(rows, cols, mines)
+                            game_loop(rows, cols, mines, no_guess)
                             # Quand on quitte le jeu, on revient au menu
                             screen = pygame.display.set_mode(
                                 (screen_width, screen_height))
@@ -446,7 +1161,7 @@ def main_menu():
 
 
 # --- BOUCLE DE JEU ---
-def game_loop(rows, cols, num_mines):
+def game_loop(rows, cols, num_mines, no_guess=False):
     # Calcul dynamique de la taille de la fenêtre
     screen_width = MARGIN + (CELL_SIZE + MARGIN) * cols
     screen_height = MARGIN + (CELL_SIZE + MARGIN) * rows + TOOLBAR_HEIGHT
@@ -454,15 +1169,18 @@ def game_loop(rows, cols, num_mines):
     pygame.display.set_caption("Démineur IA - CSP Solver")
     clock = pygame.time.Clock()
 
-    # Initialisation du jeu et de l'IA
-    game = MinesweeperGame(rows, cols, num_mines)
+    # Initialisation du jeu et de l'IA (calculée dans un thread, cf. AIWorker)
+    game = MinesweeperGame(rows, cols, num_mines, no_guess=no_guess, pool=BOARD_POOL)
     ai = CSPSolver(game)
+    worker = AIWorker(ai)
+    # requested : coup demandé avec ESPACE, auto_play : l'IA enchaîne les coups (touche A)
+    requested = auto_play = False
+    # Ce qui est déjà à l'écran : codes des cases dessinées (None = tout redessiner), bandeau, overlay
+    drawn, header_key, overlay_drawn = None, None, False
 
     hover_cell = None
     running = True
     while running:
-        screen.fill(BG_COLOR)
-
         # Gestion de la souris pour savoir sur quelle case on est
         mouse_pos = pygame.mouse.get_pos()
         mouse_c = (mouse_pos[0] - MARGIN) // (CELL_SIZE + MARGIN)
@@ -484,71 +1202,99 @@ def game_loop(rows, cols, num_mines):
                         game.reveal(r, c)
                     elif event.button == 3:
                         game.toggle_flag(r, c)
+                    # La grille a changé : le calcul en cours ne vaut plus rien
+                    worker.cancel()
 
             if event.type == pygame.KEYDOWN:
                 # TOUCHE ESPACE : L'IA joue
                 if event.key == pygame.K_SPACE and not game.game_over:
-                    moves = ai.find_safe_moves()
-                    print(f"IA suggère {len(moves)} coups.")
-                    for (r, c, action) in moves:
-                        if action == 'REVEAL':
-                            game.reveal(r, c)
-                        elif action == 'FLAG' and not game.flags[r][c]:
-                            game.toggle_flag(r, c)
+                    requested = True
+
+                # TOUCHE A : l'IA joue toute seule jusqu'à la fin de la partie
+                if event.key == pygame.K_a:
+                    auto_play = not auto_play
 
                 # Reset avec 'R'
                 if event.key == pygame.K_r:
-                    game = MinesweeperGame(rows, cols, num_mines)
+                    worker.cancel()
+                    game = MinesweeperGame(rows, cols, num_mines, no_guess=no_guess, pool=BOARD_POOL)
                     ai = CSPSolver(game)
+                    worker = AIWorker(ai)
+                    requested = auto_play = False
+                    drawn, overlay_drawn = None, False
                     print("Nouvelle partie !")
 
                 if event.key == pygame.K_ESCAPE:
+                    worker.cancel()
                     running = False
 
+        # --- IA : résultats du thread et calcul suivant ---
+        result = worker.poll()
+        if result is not None:
+            version, moves = result
+            # Coups calculés sur une grille qui a changé depuis : on les jette
+            if version == game.version:
+                print(f"IA suggère {len(moves)} coups.")
+                game.apply_moves(moves)
+                # Aucun coup joué (rien trouvé, ou coups sans effet) : le mode auto s'arrête
+                if game.version == version:
+                    auto_play = False
+        if (requested or auto_play) and not game.game_over and worker.submit(game):
+            requested = False
+        if game.game_over:
+            requested = auto_play = False
+
         # --- DESSIN DE L'INTERFACE ---
-        header_rect = pygame.Rect(0, 0, screen_width, TOOLBAR_HEIGHT)
-        draw_rounded_rect(screen, HEADER_COLOR, header_rect, radius=0)
-
-        flags_placed = sum(row.count(True) for row in game.flags)
-        draw_text(screen, "DÉMINEUR IA", 32, TEXT_LIGHT,
-                  screen_width // 2, 25, bold=True)
-        draw_text_left(
-            screen, f"💣 {game.total_mines - flags_placed}", 22, ACCENT_BLUE, 20, 55, bold=True)
-
-        if not game.game_over:
-            draw_text(screen, "[ESPACE] IA | [R] Reset | [ECHAP] Menu",
-                      16, TEXT_LIGHT, screen_width // 2, 70)
+        # Seul ce qui a changé est redessiné : le bandeau si son texte change, les cases dont
+        # l'image change (révélée, drapeau, survol). Tout est redessiné au début et en fin de partie
+        full = drawn is None or (game.game_over and not overlay_drawn)
+        dirty = []
+        if full:
+            screen.fill(BG_COLOR)
+            drawn = np.full((rows, cols), -1, dtype=np.int8)
+            header_key = None
+
+        flags_placed = int(game.flags.sum())
+        if worker.busy:
+            # Avancement du calcul de l'IA
+            p = ai.progress
+            status = f"IA : {p['stage']}"
+            if p["components"]:
+                status += f" {p['component']}/{p['components']}"
+            status += f" | {p['decided']} décidées | {ai.stats['cp_sat_calls']} appels CP-SAT"
+            status_style = (GOLD, False)
+        elif not game.game_over:
+            status = f"[ESPACE] IA | [A] Auto{' (on)' if auto_play else ''} | [R] Reset | [ECHAP] Menu"
+            status_style = (TEXT_LIGHT, False)
         else:
-            draw_text(screen, "[R] Reset | [ECHAP] Menu", 16,
-                      SUCCESS_GREEN if game.win else FLAG_COLOR, screen_width // 2, 70, bold=True)
-
-        # Dessin de la grille
-        for r in range(rows):
-            for c in range(cols):
-                rect = pygame.Rect(MARGIN + c * (CELL_SIZE + MARGIN), TOOLBAR_HEIGHT +
-                                   MARGIN + r * (CELL_SIZE + MARGIN), CELL_SIZE, CELL_SIZE)
-                center_x, center_y = rect.centerx, rect.centery
-                is_hover = (hover_cell == (r, c)) and not game.game_over
-
-                if game.visible[r][c]:
-                    draw_rounded_rect(screen, CELL_REVEALED, rect, radius=6)
-                    if game.grid[r][c] == -1:
-                        draw_mine(screen, center_x, center_y,
-                                  size=CELL_SIZE // 3)
-                    elif game.grid[r][c] > 0:
-                        val = game.grid[r][c]
-                        color = NUMBER_COLORS[val - 1]
-                        draw_text(screen, str(val), 20, color,
-                                  center_x, center_y, bold=True)
-                else:
-                    draw_rounded_rect(
-                        screen, CELL_HOVER if is_hover else CELL_HIDDEN, rect, radius=6)
-                    if game.flags[r][c]:
-                        draw_flag(screen, center_x, center_y,
-                                  size=CELL_SIZE // 3)
-
-        # Overlay Game Over / Victoire
-        if game.game_over:
+            status = "[R] Reset | [ECHAP] Menu"
+            status_style = (SUCCESS_GREEN if game.win else FLAG_COLOR, True)
+
+        key = (game.total_mines - flags_placed, status, status_style)
+        if key != header_key:
+            header_key = key
+            header_rect = pygame.Rect(0, 0, screen_width, TOOLBAR_HEIGHT)
+            draw_rounded_rect(screen, HEADER_COLOR, header_rect, radius=0)
+            draw_text(screen, "DÉMINEUR IA", 32, TEXT_LIGHT,
+                      screen_width // 2, 25, bold=True)
+            draw_text_left(
+                screen, f"💣 {game.total_mines - flags_placed}", 22, ACCENT_BLUE, 20, 55, bold=True)
+            draw_text(screen, status, 16, status_style[0], screen_width // 2, 70, bold=status_style[1])
+            dirty.append(header_rect)
+
+        # Dessin des cases qui ont changé, à partir des images précalculées
+        tiles = cell_tiles()
+        codes = cell_codes(game, None if game.game_over else hover_cell)
+        for r, c in np.argwhere(codes != drawn).tolist():
+            rect = pygame.Rect(MARGIN + c * (CELL_SIZE + MARGIN), TOOLBAR_HEIGHT +
+                               MARGIN + r * (CELL_SIZE + MARGIN), CELL_SIZE, CELL_SIZE)
+            screen.blit(tiles[codes[r, c]], rect)
+            dirty.append(rect)
+        drawn = codes
+
+        # Overlay Game Over / Victoire (dessiné une fois, par-dessus la grille finale)
+        if game.game_over and not overlay_drawn:
+            overlay_drawn = True
             overlay = pygame.Surface(
                 (screen_width, screen_height), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 150))
@@ -561,10 +1307,24 @@ def game_loop(rows, cols, num_mines):
             draw_text(screen, subtitle, 20, TEXT_LIGHT,
                       screen_width // 2, screen_height // 2 + 30)
 
-        pygame.display.flip()
+        if full:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
         clock.tick(60)
 
 
 # Point d'entrée
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Démineur IA")
+    parser.add_argument("--pregenerate", type=int, default=0, metavar="N",
+                        help="ajoute N grilles sans hasard par niveau à cache/boards.npz, sans lancer le jeu")
+    args = parser.parse_args()
+    if args.pregenerate:
+        BOARD_POOL.load()
+        for config in LEVELS.values():
+            BOARD_POOL.fill(config["size"][1], config["size"][0], config["mines"], args.pregenerate)
+        BOARD_POOL.save()
+        print({size: len(boards) for size, boards in BOARD_POOL.boards.items()})
+    else:
+        main_menu()
@@ -1,6 +1,6 @@
 import sys
 import os
-from llm_agent import llm_choose_next_guess  # ✅ Ici, on importe notre agent LLM
+from llm_agent import LLMAdvisor, StubModel, get_model  # ✅ Ici, on importe notre agent LLM
 
 # =========================================================
 # Make project root importable
@@ -13,18 +13,35 @@ if PROJECT_ROOT not in sys.path:
 # Imports FastAPI
 # =========================================================
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import json
+from functools import lru_cache
+import random
+import time
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 # 🔹 utils.py is in the same folder
+from . import metrics
+from .sessions import make_store
 from .utils import (
     get_word_of_the_day,
     get_word_list,
-    check_character,
+    get_valid_words,
+    character_info,
     get_random_word as get_random_word_util,
 )
 
-from Solveur_wordle.Solveur_Wordle import WordleSolver
+from Solveur_wordle.Solveur_Wordle import WordleSolver, default_opener
+from Solveur_wordle.feedback import code_to_pattern, feedback_code
+from Solveur_wordle.opening_book import load_books
+from Solveur_wordle.scoring import SCORERS
+from Solveur_wordle.simulation import chunked, play_absurdle, play_games, summarize
+from Solveur_wordle.wordlist import DEFAULT_LENGTH
 
 # =========================================================
 # App setup
@@ -42,8 +59,48 @@ app.add_middleware(
 # GLOBAL GAME STATE
 # =========================================================
 word_of_the_day: str = get_word_of_the_day().upper()
-current_random_word: str | None = None
 word_list = get_word_list()
+# Arbres d'ouverture précalculés (python -m Solveur_wordle.opening_book)
+opening_books = load_books(word_list)
+# Parties "mot aléatoire" : une session par joueur (WORDLE_SESSION_BACKEND=memory|sqlite)
+sessions = make_store()
+# Agent LLM asynchrone (WORDLE_LLM_STUB=1 : modèle local pour tester hors ligne)
+llm_advisor = LLMAdvisor(StubModel() if os.environ.get("WORDLE_LLM_STUB") else get_model())
+
+
+# Autres longueurs de mots (paramètre `length`), chargées à la première utilisation
+@lru_cache(maxsize=None)
+def daily_word(length=DEFAULT_LENGTH):
+    if length == DEFAULT_LENGTH:
+        return word_of_the_day
+    return get_word_of_the_day(length).upper()
+
+
+@lru_cache(maxsize=None)
+def books_for(length=DEFAULT_LENGTH):
+    if length == DEFAULT_LENGTH:
+        return opening_books
+    return load_books(get_word_list(length))
+
+
+MAX_WORD_LENGTH = 15
+
+
+def length_error(length):
+    if not 1 <= length <= MAX_WORD_LENGTH or not get_word_list(length):
+        return {"error": f"No {length}-letter words available."}
+    return None
+
+
+def is_valid_guess(word, length):
+    # Longueur bornée avant la recherche : chaque longueur lit (et garde en cache) une liste de mots
+    return len(word) == length and 1 <= length <= MAX_WORD_LENGTH and word.lower() in get_valid_words(length)
+
+
+def strategy_error(strategy):
+    if strategy is not None and strategy not in SCORERS:
+        return {"error": f"Unknown strategy '{strategy}', expected one of {tuple(SCORERS)}"}
+    return None
 
 # =========================================================
 # ROOT
@@ -56,152 +113,307 @@ def read_root():
 # WORD OF THE DAY — GAME API
 # =========================================================
 @app.get("/word-of-the-day")
-def get_word_of_the_day_endpoint():
-    return {"word": word_of_the_day}
+def get_word_of_the_day_endpoint(length: int = DEFAULT_LENGTH):
+    return length_error(length) or {"word": daily_word(length)}
+
+
+def guess_response(guess_word, feedback):
+    """HTTP response for a valid guess (character_info kept for the existing clients)."""
+    if feedback == "G" * len(feedback):
+        return {"guess": guess_word, "is_correct": True, "is_word_in_list": True, "feedback": feedback}
+    return {
+        "guess": guess_word,
+        "is_correct": False,
+        "is_word_in_list": True,
+        "feedback": feedback,
+        "character_info": character_info(guess_word, feedback),
+    }
 
 
 @app.post("/word-of-the-day/{word}")
 def send_guess_word(word: str):
     guess_word = word.upper()
 
-    if guess_word.lower() not in word_list:
+    if not is_valid_guess(guess_word, len(guess_word)):
         return {"guess": guess_word, "is_correct": False, "is_word_in_list": False}
 
-    if guess_word == word_of_the_day:
-        return {"guess": guess_word, "is_correct": True, "is_word_in_list": True}
-
-    guess_result = [
-        check_character(c, word_of_the_day, i)
-        for i, c in enumerate(guess_word)
-    ]
-
-    return {
-        "guess": guess_word,
-        "is_correct": False,
-        "is_word_in_list": True,
-        "character_info": guess_result,
-    }
+    code = feedback_code(guess_word, daily_word(len(guess_word)))
+    return guess_response(guess_word, code_to_pattern(code, len(guess_word)))
 
 # =========================================================
 # RANDOM WORD — GAME API
 # =========================================================
+def record_random_guess(session, guess):
+    """Score a valid guess for a session, record it and persist the session."""
+    with metrics.stage("feedback"):
+        feedback = code_to_pattern(feedback_code(guess, session.target.lower()), len(guess))
+    # record() also filters the session solver when it is loaded
+    with metrics.stage("filter"):
+        session.record(guess, feedback)
+    if feedback == "G" * len(guess):
+        # Partie terminée
+        sessions.delete(session.session_id)
+    else:
+        sessions.save(session)
+    return feedback
+
+
 @app.get("/random-word")
-def get_random_word_endpoint():
-    global current_random_word
-    current_random_word = get_random_word_util().upper()
-    return {"word": current_random_word}
+def get_random_word_endpoint(length: int = DEFAULT_LENGTH):
+    error = length_error(length)
+    if error:
+        return error
+    session = sessions.create(get_random_word_util(length).upper())
+    return {"word": session.target, "session_id": session.session_id}
 
 
 @app.post("/random-word/{word}")
-def guess_random_word(word: str):
-    global current_random_word
+def guess_random_word(word: str, session_id: str | None = None):
+    session = sessions.get(session_id) if session_id else None
 
-    if current_random_word is None:
-        return {"error": "No random word generated. Call GET /random-word first."}
+    if session is None:
+        return {"error": "Unknown or expired session. Call GET /random-word first."}
 
     guess_word = word.upper()
 
-    if guess_word.lower() not in word_list:
+    if not is_valid_guess(guess_word, len(session.target)):
         return {"guess": guess_word, "is_correct": False, "is_word_in_list": False}
 
-    if guess_word == current_random_word:
-        current_random_word = None
-        return {"guess": guess_word, "is_correct": True, "is_word_in_list": True}
+    return guess_response(guess_word, record_random_guess(session, guess_word.lower()))
 
-    guess_result = [
-        check_character(c, current_random_word, i)
-        for i, c in enumerate(guess_word)
-    ]
-
-    return {
-        "guess": guess_word,
-        "is_correct": False,
-        "is_word_in_list": True,
-        "character_info": guess_result,
-    }
+# =========================================================
+# NEXT GUESS — opening book, LLM or pattern-matrix strategy
+# =========================================================
+def first_guess(strategy=None, length=DEFAULT_LENGTH):
+    book = books_for(length).get(strategy)
+    return book.first() if book else default_opener(get_word_list(length))
+
+
+async def choose_next_guess(solver, steps, strategy=None):
+    # strategy (see scoring.SCORERS) -> book if any, then solver ranking; otherwise LLM + CSP
+    if strategy is not None:
+        book = books_for(solver.length).get(strategy)
+        guess = book.next_guess(steps) if book else None
+        if guess:
+            return guess
+        with metrics.stage("suggest"):
+            suggestions = await run_in_threadpool(solver.suggest, strategy, 1)
+        return suggestions[0] if suggestions else None
+    # CSP suggestions first (cached on the solver state, the advisor reuses them)
+    with metrics.stage("suggest"):
+        solver.rank("frequency", 5)
+    with metrics.stage("llm"):
+        return await llm_advisor.choose_next_guess(solver, steps)
 
 # =========================================================
-# SOLVER — DAILY WORD (CSP + LLM)
+# SOLVER LOOPS — one step yielded as soon as it is computed
 # =========================================================
-@app.get("/run-daily")
-def run_solver_daily():
-    print("RUN DAILY CALLED — LLM SHOULD BE USED")
-    solver = WordleSolver(word_list)
-    guess = "crane"
+async def daily_steps(strategy=None, length=DEFAULT_LENGTH):
+    metrics.GAMES.inc("daily")
+    solver = WordleSolver(get_word_list(length))
+    valid = get_valid_words(length)
+    target = daily_word(length).lower()
+    guess = first_guess(strategy, length)
     steps = []
-    step = 1
-
-    while True:
-        response = send_guess_word(guess)
 
-        if not response["is_word_in_list"]:
+    while guess is not None:
+        # Feedback calculé directement (sans passer par les réponses HTTP)
+        if guess not in valid:
             break
 
-        if response["is_correct"]:
-            steps.append({"step": step, "guess": guess, "feedback": "GGGGG"})
+        with metrics.stage("feedback"):
+            feedback = code_to_pattern(feedback_code(guess, target), len(guess))
+
+        steps.append({"step": len(steps) + 1, "guess": guess, "feedback": feedback})
+        yield steps[-1]
+        metrics.STEPS.inc("daily")
+
+        if guess == target:
             break
 
-        feedback = "".join(
-            "G" if c["scoring"]["correct_idx"]
-            else "Y" if c["scoring"]["in_word"]
-            else "B"
-            for c in response["character_info"]
-        )
+        with metrics.stage("filter"):
+            solver.apply_feedback(guess, feedback)
+        metrics.CANDIDATES.observe(solver.mask.bit_count())
 
-        steps.append({"step": step, "guess": guess, "feedback": feedback})
+        # ✅ Ici on utilise l'agent LLM (ou le moteur de patterns) pour choisir le prochain mot
+        guess = await choose_next_guess(solver, steps, strategy)
 
-        solver.apply_feedback(guess, feedback)
 
-        # ✅ Ici on utilise l'agent LLM pour choisir le prochain mot
-        print("ABOUT TO CALL LLM")
-        guess = llm_choose_next_guess(solver, steps)
+async def random_steps(session, strategy=None):
+    # Le solveur de la session tient déjà compte des coups joués à la main
+    metrics.GAMES.inc("random")
+    length = len(session.target)
+    solver = session.solver(get_word_list(length))
+    valid = get_valid_words(length)
+    steps = list(session.history)
+    guess = await choose_next_guess(solver, steps, strategy) if steps else first_guess(strategy, length)
 
-        step += 1
+    while guess is not None:
+        if guess not in valid:
+            break
 
-    return {"steps": steps}
+        feedback = record_random_guess(session, guess)
 
-# =========================================================
-# SOLVER — RANDOM WORD (CSP + LLM)
-# =========================================================
-@app.get("/run-random")
-def run_solver_random():
-    global current_random_word
+        steps.append(session.history[-1])
+        yield steps[-1]
+        metrics.STEPS.inc("random")
 
-    if current_random_word is None:
-        current_random_word = get_random_word_util().upper()
+        if feedback == "G" * len(guess):
+            break
+        metrics.CANDIDATES.observe(solver.mask.bit_count())
 
-    solver = WordleSolver(word_list)
-    guess = "crane"
-    steps = []
-    step = 1
+        # ✅ LLM next guess
+        guess = await choose_next_guess(solver, steps, strategy)
 
-    while True:
-        response = guess_random_word(guess)
 
-        if not response["is_word_in_list"]:
-            break
+def open_random_session(session_id=None, length=DEFAULT_LENGTH):
+    """Existing session, a new one if no id is given, or None if it expired."""
+    if session_id:
+        return sessions.get(session_id)
+    return sessions.create(get_random_word_util(length).upper())
 
-        if response["is_correct"]:
-            steps.append({"step": step, "guess": guess, "feedback": "GGGGG"})
-            break
 
-        feedback = "".join(
-            "G" if c["scoring"]["correct_idx"]
-            else "Y" if c["scoring"]["in_word"]
-            else "B"
-            for c in response["character_info"]
-        )
+async def ndjson(lines):
+    async for line in lines:
+        yield json.dumps(line) + "\n"
 
-        steps.append({"step": step, "guess": guess, "feedback": feedback})
+# =========================================================
+# SOLVER — DAILY WORD (CSP + LLM)
+# =========================================================
+@app.get("/run-daily")
+async def run_solver_daily(strategy: str | None = None, length: int = DEFAULT_LENGTH):
+    error = length_error(length) or strategy_error(strategy)
+    if error:
+        return error
+    return {"steps": [step async for step in daily_steps(strategy, length)]}
 
-        solver.apply_feedback(guess, feedback)
 
-        # ✅ LLM next guess
-        guess = llm_choose_next_guess(solver, steps)
+@app.get("/run-daily/stream")
+async def run_solver_daily_stream(strategy: str | None = None, length: int = DEFAULT_LENGTH):
+    """Same game as /run-daily, streamed as NDJSON (one step per line)."""
+    error = length_error(length) or strategy_error(strategy)
+    if error:
+        return error
+    return StreamingResponse(ndjson(daily_steps(strategy, length)), media_type="application/x-ndjson")
 
-        step += 1
+# =========================================================
+# SOLVER — RANDOM WORD (CSP + LLM)
+# =========================================================
+@app.get("/run-random")
+async def run_solver_random(session_id: str | None = None, strategy: str | None = None,
+                            length: int = DEFAULT_LENGTH):
+    error = length_error(length) or strategy_error(strategy)
+    if error:
+        return error
+    session = open_random_session(session_id, length)
+    if session is None:
+        return {"error": "Unknown or expired session. Call GET /random-word first."}
+
+    steps = list(session.history)
+    steps += [step async for step in random_steps(session, strategy)]
+    return {"session_id": session.session_id, "steps": steps}
+
+
+@app.get("/run-random/stream")
+async def run_solver_random_stream(session_id: str | None = None, strategy: str | None = None,
+                                   length: int = DEFAULT_LENGTH):
+    """
+    Same game as /run-random, streamed as NDJSON: a first {"session_id"} line,
+    the steps already played in the session, then each new step as it is computed.
+    """
+    error = length_error(length) or strategy_error(strategy)
+    if error:
+        return error
+    session = open_random_session(session_id, length)
+
+    async def lines():
+        if session is None:
+            yield {"error": "Unknown or expired session. Call GET /random-word first."}
+            return
+        yield {"session_id": session.session_id}
+        for step in list(session.history):
+            yield step
+        async for step in random_steps(session, strategy):
+            yield step
+
+    return StreamingResponse(ndjson(lines()), media_type="application/x-ndjson")
 
-    return {"steps": steps}
+# =========================================================
+# SOLVER — BATCH OF GAMES (CSP / strategies, no LLM)
+# =========================================================
+BATCH_WORKERS = os.cpu_count() or 1
+batch_pool = None
+
+
+class BatchRequest(BaseModel):
+    words: list[str] | None = None   # mots cibles explicites
+    count: int | None = Field(default=None, gt=0)  # ou nombre de mots tirés au hasard
+    seed: int | None = None
+    strategy: str | None = None
+    length: int = DEFAULT_LENGTH
+    hard_mode: bool = False
+
+
+def get_batch_pool():
+    # Créé au premier batch, un processus par cœur
+    global batch_pool
+    if batch_pool is None:
+        batch_pool = ProcessPoolExecutor(BATCH_WORKERS)
+    return batch_pool
+
+
+@app.on_event("shutdown")
+def shutdown_batch_pool():
+    if batch_pool is not None:
+        batch_pool.shutdown(cancel_futures=True)
+
+
+@app.post("/run-batch")
+async def run_solver_batch(request: BatchRequest):
+    error = length_error(request.length) or strategy_error(request.strategy)
+    if error:
+        return error
+    words = get_word_list(request.length)
+    if request.words:
+        targets = [w.lower() for w in request.words]
+        valid = get_valid_words(request.length)
+        unknown = [w for w in targets if w not in valid]
+        if unknown:
+            return {"error": f"Words not in list: {unknown[:10]}"}
+    elif request.count:
+        count = min(request.count, len(words))
+        targets = random.Random(request.seed).sample(words, count)
+    else:
+        return {"error": "Provide 'words' or 'count'."}
+
+    loop = asyncio.get_running_loop()
+    pool = get_batch_pool()
+    start = time.perf_counter()
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(pool, play_games, chunk, request.strategy, request.hard_mode)
+        for chunk in chunked(targets, BATCH_WORKERS * 4)
+    ])
+    results = [r for part in parts for r in part]
+    return summarize(results, request.strategy, time.perf_counter() - start)
+
+# =========================================================
+# SOLVER — ADVERSARIAL HOST (absurdle)
+# =========================================================
+@app.get("/run-absurdle")
+async def run_solver_absurdle(strategy: str | None = None, hard_mode: bool = False,
+                              length: int = DEFAULT_LENGTH):
+    """The host keeps the largest feedback bucket after each guess (no fixed target, no LLM)."""
+    error = length_error(length) or strategy_error(strategy)
+    if error:
+        return error
+    return await run_in_threadpool(play_absurdle, get_word_list(length), strategy, hard_mode)
+
+# =========================================================
+# METRICS (Prometheus text format)
+# =========================================================
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(llm_advisor.stats), media_type="text/plain; version=0.0.4")
 
 # =========================================================
 # START SERVER
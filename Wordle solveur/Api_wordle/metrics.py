@@ -0,0 +1,108 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# ---------- Metric types ----------
+# Minimal Prometheus text format (no extra dependency): a histogram is a fixed list
+# of bucket counters, observe() is one bisect and two additions under a lock.
+
+# Stage durations in seconds (0.1 ms .. 10 s)
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Candidate-set sizes
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._values.items())
+        for values, total in series:
+            lines.append(f"{self.name}{_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # label values -> [bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        for values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                labels = _labels(self.labels + ("le",), values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {count}")
+        return lines
+
+
+# ---------- Wordle API metrics ----------
+STAGE_SECONDS = Histogram(
+    "wordle_stage_seconds", "Time spent per solver stage (feedback, filter, suggest, llm).",
+    TIME_BUCKETS, labels=("stage",),
+)
+CANDIDATES = Histogram(
+    "wordle_candidates", "Remaining candidates after each feedback.", SIZE_BUCKETS,
+)
+GAMES = Counter("wordle_games_total", "Solver games started.", labels=("mode",))
+STEPS = Counter("wordle_steps_total", "Guesses played by the solver.", labels=("mode",))
+
+
+@contextmanager
+def stage(name):
+    """with stage("filter"): ... -> one observation in wordle_stage_seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, name)
+
+
+def render(llm_stats=None):
+    """Prometheus text exposition of every metric (+ the LLM advisor counters)."""
+    lines = []
+    for metric in (STAGE_SECONDS, CANDIDATES, GAMES, STEPS):
+        lines += metric.render()
+    for key, value in sorted((llm_stats or {}).items()):
+        name = f"wordle_llm_{key}_total"
+        lines += [f"# HELP {name} LLM advisor {key.replace('_', ' ')}.", f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from Solveur_wordle.Solveur_Wordle import WordleSolver
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Configuration par variables d'environnement
+SESSION_BACKEND = os.environ.get("WORDLE_SESSION_BACKEND", "memory")  # memory | sqlite
+SESSION_DB = os.environ.get("WORDLE_SESSION_DB", os.path.join(PROJECT_ROOT, "cache", "sessions.sqlite3"))
+SESSION_TTL = float(os.environ.get("WORDLE_SESSION_TTL", 3600))
+MAX_SESSIONS = int(os.environ.get("WORDLE_MAX_SESSIONS", 10000))
+
+
+# ---------- Game session ----------
+class GameSession:
+    """One random-word game: target, guess history and the solver state after those guesses."""
+
+    def __init__(self, session_id, target, history=None, last_access=None):
+        self.session_id = session_id
+        self.target = target
+        self.history = list(history or [])
+        self.last_access = last_access or time.time()
+        self._solver = None
+
+    def solver(self, wordlist):
+        # Built lazily and replayed from the history (e.g. after loading from SQLite),
+        # then kept up to date by record()
+        if self._solver is None:
+            self._solver = WordleSolver(wordlist)
+            for step in self.history:
+                if step["feedback"] != "G" * len(step["guess"]):
+                    self._solver.apply_feedback(step["guess"], step["feedback"])
+        return self._solver
+
+    def record(self, guess, feedback):
+        self.history.append({"step": len(self.history) + 1, "guess": guess, "feedback": feedback})
+        if self._solver is not None and feedback != "G" * len(guess):
+            self._solver.apply_feedback(guess, feedback)
+
+
+# ---------- Stores ----------
+class SessionStore(ABC):
+    """Session-keyed game store with TTL eviction and a bounded size."""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+
+    def create(self, target):
+        session = GameSession(uuid.uuid4().hex, target)
+        self.save(session)
+        return session
+
+    @abstractmethod
+    def get(self, session_id):
+        """The session, or None if unknown or expired."""
+
+    @abstractmethod
+    def save(self, session):
+        """Store the session and refresh its last access time."""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Forget the session (no error if it is unknown)."""
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU: the least recently used session is evicted when the store is full."""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        super().__init__(ttl, max_sessions)
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_access > self.ttl:
+                del self._sessions[session_id]
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session):
+        now = time.time()
+        with self._lock:
+            session.last_access = now
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            self._evict(now)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    SQLite-backed store shared by several uvicorn workers on the same host.
+    Only the target and history are stored, the solver is replayed on load.
+    """
+
+    def __init__(self, path=SESSION_DB, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        super().__init__(ttl, max_sessions)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, target TEXT NOT NULL, history TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions(last_access)")
+
+    def _conn(self):
+        # One connection per thread (sqlite3 connections are not shareable by default)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT target, history, last_access FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                return None
+            conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        return GameSession(session_id, row[0], json.loads(row[1]), now)
+
+    def save(self, session):
+        now = time.time()
+        session.last_access = now
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, target, history, last_access) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.target, json.dumps(session.history), now),
+            )
+            conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM sessions WHERE id IN ("
+                "SELECT id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+
+    def delete(self, session_id):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+def make_store(backend=SESSION_BACKEND):
+    if backend == "sqlite":
+        return SqliteSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown session backend '{backend}', expected 'memory' or 'sqlite'")
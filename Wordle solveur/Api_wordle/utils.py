@@ -1,33 +1,36 @@
 import random
 import datetime
-import os
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-WORD_FILE = os.path.join(PROJECT_ROOT, "word_list.txt")
+from Solveur_wordle.wordlist import DEFAULT_LENGTH, load_words
 
-def get_word_of_the_day():
+def get_word_of_the_day(length=DEFAULT_LENGTH):
     """Return a deterministic word based on the current date."""
-    with open(WORD_FILE, "r", encoding="utf-8") as f:
-        words = [w.strip() for w in f if len(w.strip()) == 5]
+    words = load_words(length).words
 
     random.seed(int(datetime.datetime.now().strftime("%Y%m%d")))
     return random.choice(words).upper()
 
-def get_word_list():
-    """Return a sorted list of words from the local file."""
-    with open(WORD_FILE, "r", encoding="utf-8") as f:
-        return sorted(w.strip().lower() for w in f if len(w.strip()) == 5)
+def get_word_list(length=DEFAULT_LENGTH):
+    """Return the sorted word list (shared, read once from the local file)."""
+    return load_words(length).sorted
 
-def get_random_word():
+def get_valid_words(length=DEFAULT_LENGTH):
+    """Return the frozenset of accepted words for O(1) validation."""
+    return load_words(length).valid
+
+def get_random_word(length=DEFAULT_LENGTH):
     """Return a random word from the list (for replay mode)."""
-    return random.choice(get_word_list()).upper()
+    return random.choice(get_word_list(length)).upper()
 
-def check_character(guess_character, answer, idx):
-    """Return feedback for a single character (green/yellow/gray)."""
-    return {
-        "char": guess_character,
-        "scoring": {
-            "in_word": guess_character in answer,
-            "correct_idx": guess_character == answer[idx],
-        },
-    }
+def character_info(guess_word, feedback):
+    """Per-character view of a G/Y/B feedback string (green/yellow/gray)."""
+    return [
+        {
+            "char": c,
+            "scoring": {
+                "in_word": f != "B",
+                "correct_idx": f == "G",
+            },
+        }
+        for c, f in zip(guess_word, feedback)
+    ]
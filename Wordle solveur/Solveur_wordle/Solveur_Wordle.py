@@ -1,42 +1,138 @@
-import os
 from collections import defaultdict, Counter
+from functools import lru_cache
+
+from .scoring import StateCache, rank
+from .word_index import WordIndex, get_index
+from .wordlist import DEFAULT_LENGTH, load_words
+
+DEFAULT_OPENER = "crane"
 
 # ---------- Load wordlist ----------
-def load_wordlist():
-    file_path = os.path.join(os.path.dirname(__file__), "..", "word_list.txt")
-    with open(file_path, "r", encoding="utf-8") as f:
-        words = [w.strip().lower() for w in f if len(w.strip()) == 5]
-    print(f"Loaded {len(words)} words from word_list.txt")
-    return words
+def load_wordlist(length=DEFAULT_LENGTH):
+    # Shared with the API, the file is only read once per process
+    return list(load_words(length).words)
+
+
+@lru_cache(maxsize=8)
+def _opener(index):
+    if index.length == len(DEFAULT_OPENER) and DEFAULT_OPENER in index.words:
+        return DEFAULT_OPENER
+    suggestions = WordleSolver(index).suggest()
+    return suggestions[0] if suggestions else None
+
+
+def default_opener(wordlist):
+    """'crane' for the standard list, otherwise the best suggestion on the full list (cached)."""
+    return _opener(wordlist if isinstance(wordlist, WordIndex) else get_index(wordlist))
 
 # ---------- CSP Wordle solver ----------
 class WordleSolver:
-    def __init__(self, wordlist):
-        self.candidates = list(wordlist)
+    def __init__(self, wordlist, hard_mode=False):
+        # The index is shared between solvers built on the same word list
+        self.index = wordlist if isinstance(wordlist, WordIndex) else get_index(wordlist)
+        # Hard mode: every guess must reuse the greens in place and contain the revealed letters
+        self.hard_mode = hard_mode
+        self.mask = self.index.all
+        self.length = self.index.length
         self.fixed = {}
         self.forbidden_pos = defaultdict(set)
         self.min_count = defaultdict(int)
         self.max_count = {}
+        # States before each apply_feedback, for undo()
+        self._undo = []
+        self._state = None
+        # strategy -> time (ms) of its last computation
+        self.timings = {}
+
+    def state(self):
+        """Precomputations and rankings of the current candidate set, reset when the mask changes."""
+        guess_mask = self.guess_mask() if self.hard_mode else None
+        state = self._state
+        if state is None or state.mask != self.mask or state.guess_mask != guess_mask:
+            self._state = StateCache(self.index, self.mask, guess_mask)
+        return self._state
+
+    def guess_mask(self):
+        """Words allowed as the next guess in hard mode (a superset of the candidates)."""
+        idx = self.index
+        mask = idx.all
+        for i, l in self.fixed.items():
+            mask &= idx.position(i, l)
+        for ch, c in self.min_count.items():
+            mask &= idx.at_least(ch, c)
+        return mask
+
+    def is_allowed(self, guess):
+        """False if `guess` breaks the hard-mode rules (always True in normal mode)."""
+        if not self.hard_mode:
+            return True
+        if any(guess[i] != l for i, l in self.fixed.items()):
+            return False
+        return all(guess.count(ch) >= c for ch, c in self.min_count.items())
+
+    @property
+    def candidates(self):
+        # Decoded lazily from the bitset, only when the state changed
+        return self.state().candidates
 
+    # ---------- Snapshot / undo ----------
+    def snapshot(self):
+        """Cheap copy of the solver state (the candidate set is a single int)."""
+        return (
+            self.mask,
+            dict(self.fixed),
+            {i: set(forb) for i, forb in self.forbidden_pos.items()},
+            dict(self.min_count),
+            dict(self.max_count),
+        )
+
+    def restore(self, state):
+        mask, fixed, forbidden_pos, min_count, max_count = state
+        self.mask = mask
+        self.fixed = dict(fixed)
+        self.forbidden_pos = defaultdict(set, {i: set(forb) for i, forb in forbidden_pos.items()})
+        self.min_count = defaultdict(int, min_count)
+        self.max_count = dict(max_count)
+
+    def undo(self):
+        """Revert the last apply_feedback. Returns False if there is nothing to undo."""
+        if not self._undo:
+            return False
+        self.restore(self._undo.pop())
+        return True
+
+    # ---------- Constraints ----------
     def apply_feedback(self, guess, fb):
+        # Only the constraints this feedback adds are turned into bitset operations,
+        # the remaining candidates already satisfy the earlier ones
+        self._undo.append(self.snapshot())
+        idx = self.index
+        mask = self.mask
+
         seen = defaultdict(int)
         for ch, f in zip(guess, fb):
             if f in "GY":
                 seen[ch] += 1
         for ch, n in seen.items():
-            self.min_count[ch] = max(self.min_count[ch], n)
+            if n > self.min_count[ch]:
+                self.min_count[ch] = n
+                mask &= idx.at_least(ch, n)
         for i, (g, f) in enumerate(zip(guess, fb)):
             if f == 'G':
-                self.fixed[i] = g
-            elif f == 'Y':
-                self.forbidden_pos[i].add(g)
-            elif f == 'B':
-                if self.min_count[g] == 0:
-                    self.max_count[g] = 0
-                else:
-                    self.max_count[g] = self.min_count[g]
-                self.forbidden_pos[i].add(g)
-        self.filter()
+                if self.fixed.get(i) != g:
+                    self.fixed[i] = g
+                    mask &= idx.position(i, g)
+            elif f in 'YB':
+                if g not in self.forbidden_pos[i]:
+                    self.forbidden_pos[i].add(g)
+                    mask &= ~idx.position(i, g)
+                if f == 'B':
+                    limit = self.min_count[g]
+                    previous = self.max_count.get(g)
+                    self.max_count[g] = limit
+                    if previous is None or limit < previous:
+                        mask &= ~idx.at_least(g, limit + 1)
+        self.mask = mask
 
     def matches(self, word):
         for i, l in self.fixed.items():
@@ -55,16 +151,32 @@ class WordleSolver:
         return True
 
     def filter(self):
-        self.candidates = [w for w in self.candidates if self.matches(w)]
-
-    def suggest(self):
-        freq = Counter()
-        for w in self.candidates:
-            for ch in set(w):
-                freq[ch] += 1
-        scored = []
-        for w in self.candidates:
-            score = sum(freq[ch] for ch in set(w))
-            scored.append((score, w))
-        scored.sort(reverse=True)
-        return [w for _, w in scored[:5]]
+        # Same rules as matches(), applied to every word at once via the bitsets
+        idx = self.index
+        mask = self.mask
+        for i, l in self.fixed.items():
+            mask &= idx.position(i, l)
+        for i, forb in self.forbidden_pos.items():
+            for ch in forb:
+                mask &= ~idx.position(i, ch)
+        for ch, c in self.min_count.items():
+            mask &= idx.at_least(ch, c)
+        for ch, c in self.max_count.items():
+            mask &= ~idx.at_least(ch, c + 1)
+        self.mask = mask
+
+    def rank(self, strategy="frequency", k=5):
+        """
+        Suggestion(strategy, words, elapsed_ms) for the current state.
+        Computed once per state: repeated calls before the next feedback are free.
+        """
+        state = self.state()
+        cached = (strategy, k) in state.rankings
+        suggestion = rank(state, strategy, k)
+        if not cached:
+            self.timings[strategy] = suggestion.elapsed_ms
+        return suggestion
+
+    def suggest(self, strategy="frequency", k=5):
+        # strategy: frequency | positional | entropy | expected | minimax (see scoring.SCORERS)
+        return self.rank(strategy, k).words
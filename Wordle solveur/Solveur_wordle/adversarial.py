@@ -0,0 +1,221 @@
+import time
+import argparse
+from functools import cached_property
+
+import numpy as np
+
+from .feedback import code_to_pattern
+from .guess_engine import SCORE_CHUNK, bucket_sizes, get_engine
+
+# Below this many candidates, bucket sizes are counted by pairwise comparison
+# (cheaper than one bincount over every pattern of every guess)
+PAIRWISE_MAX = 32
+
+
+# ---------- Bucket partitioning ----------
+def partition(engine, guess, candidates):
+    """
+    Split the candidate indices by the feedback they give to the word index `guess`.
+    Returns [(pattern code, sorted candidate indices)], largest bucket first.
+    """
+    codes = np.asarray(engine.matrix[guess, candidates])
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    groups = np.split(candidates[order], starts[1:])
+    buckets = [(int(sorted_codes[s]), group) for s, group in zip(starts, groups)]
+    buckets.sort(key=lambda b: -len(b[1]))
+    return buckets
+
+
+def _hints(code):
+    """Number of green / yellow squares in a pattern code."""
+    n = 0
+    while code:
+        code, d = divmod(code, 3)
+        n += d > 0
+    return n
+
+
+# ---------- Adversarial host (absurdle) ----------
+class AbsurdleHost:
+    """
+    Host that never commits to a target: after each guess it keeps the feedback
+    bucket with the most candidates (ties: fewest hints, then lowest code).
+    """
+
+    def __init__(self, words):
+        self.engine = get_engine(words)
+        self.positions = {w: i for i, w in enumerate(self.engine.words)}
+        self.candidates = np.arange(len(self.engine.words))
+        self.length = len(self.engine.words[0])
+
+    def respond(self, guess):
+        buckets = partition(self.engine, self.positions[guess], self.candidates)
+        code, survivors = max(buckets, key=lambda b: (len(b[1]), -_hints(b[0]), -b[0]))
+        self.candidates = survivors
+        return code_to_pattern(code, self.length)
+
+    @property
+    def remaining(self):
+        return [self.engine.words[i] for i in self.candidates]
+
+
+# ---------- Worst-case search ----------
+class WorstCaseSearch:
+    """
+    Number of guesses the solver needs in the worst case (i.e. against AbsurdleHost),
+    by minimax over the feedback buckets:
+
+        value(C) = min over guesses g of max over buckets B of (1 if B is solved else 1 + value(B))
+
+    - values are memoized by candidate set (exact values, and lower bounds for
+      sets whose search was cut off)
+    - alpha-beta style cut-off: a guess is abandoned as soon as one bucket proves
+      it cannot beat the best guess found so far, largest buckets are tried first
+    - guesses are tried in minimax-score order; `breadth` keeps only the best ones
+      at each node (None = exhaustive, then the value is the exact optimum)
+    - hard_mode restricts the guesses to the remaining candidates (a subset of the
+      hard-mode guesses, so the value is still a guarantee for hard mode)
+    """
+
+    def __init__(self, words, hard_mode=False, breadth=None):
+        self.engine = get_engine(words)
+        self.words = self.engine.words
+        self.hard_mode = hard_mode
+        self.breadth = breadth
+        self.solved = self.engine.n_patterns - 1
+        self._exact = {}
+        self._lower = {}
+        self._moves = {}
+        self.stats = {"nodes": 0, "memo_hits": 0, "cutoffs": 0}
+
+    @cached_property
+    def _by_answer(self):
+        # Answer-major copy of the pattern matrix: the patterns of a few candidates
+        # against every guess are then contiguous rows instead of strided columns
+        return np.ascontiguousarray(self.engine.matrix.T)
+
+    def _largest_buckets(self, candidates, guesses=None):
+        """Size of the largest feedback bucket of every guess (or of `guesses` only)."""
+        rows = self._by_answer[candidates]
+        if guesses is not None:
+            rows = rows[:, guesses]
+        if len(candidates) <= PAIRWISE_MAX:
+            # same[j, g]: candidates sharing candidate j's pattern for guess g
+            same = np.zeros(rows.shape, dtype=np.uint8)
+            for row in rows:
+                same += rows == row
+            return same.max(axis=0)
+
+        largest = np.empty(rows.shape[1], dtype=np.intp)
+        for start in range(0, rows.shape[1], SCORE_CHUNK):
+            codes = rows[:, start:start + SCORE_CHUNK].T
+            largest[start:start + SCORE_CHUNK] = bucket_sizes(codes, self.engine.n_patterns).max(axis=1)
+        return largest
+
+    def _guesses(self, candidates):
+        """Guesses to try (best minimax score first) and the smallest largest-bucket among them."""
+        if self.hard_mode:
+            pool = candidates
+            scores = -self._largest_buckets(candidates, candidates).astype(np.float64)
+            scores += 1e-9
+        else:
+            pool = np.arange(len(self.words))
+            scores = -self._largest_buckets(candidates).astype(np.float64)
+            scores[candidates] += 1e-9
+        # A guess that does not split the candidates is useless (never the case for a candidate)
+        scores[scores <= -len(candidates)] = -np.inf
+        order = np.flatnonzero(scores > -np.inf)
+        if self.breadth is not None and len(order) > self.breadth:
+            order = order[np.argpartition(-scores[order], self.breadth - 1)[:self.breadth]]
+        order = order[np.lexsort((order, -scores[order]))]
+        return pool[order], int(round(-scores[order[0]]))
+
+    def value(self, candidates, beta=float("inf")):
+        """
+        Worst-case number of guesses to solve `candidates` (sorted word indices),
+        or any result >= beta if it cannot be solved in fewer than `beta` guesses.
+        """
+        n = len(candidates)
+        if n <= 2:
+            return n
+        key = candidates.tobytes()
+        if key in self._exact:
+            self.stats["memo_hits"] += 1
+            return self._exact[key]
+        lower = self._lower.get(key, 2)
+        if lower >= beta:
+            self.stats["memo_hits"] += 1
+            return lower
+
+        self.stats["nodes"] += 1
+        guesses, smallest = self._guesses(candidates)
+        if self.hard_mode and smallest == n - 1:
+            # Each guess only eliminates itself (e.g. _ills): the same holds for every
+            # subset, so the worst case is to try them all
+            self._exact[key] = n
+            self._moves[key] = int(guesses[0])
+            return n
+        # Every guess leaves a bucket of `smallest` words or more: one that still needs 2 guesses
+        if smallest >= 2:
+            lower = max(lower, 3)
+        best, best_guess = beta, None
+        members = set(candidates.tolist())
+        for guess in guesses:
+            worst = 1 if guess in members else 2
+            for code, bucket in partition(self.engine, guess, candidates):
+                if code == self.solved:
+                    continue
+                worst = max(worst, 1 + self.value(bucket, best - 1))
+                if worst >= best:
+                    self.stats["cutoffs"] += 1
+                    break
+            if worst < best:
+                best, best_guess = worst, int(guess)
+                if best <= lower:
+                    break
+
+        if best_guess is None:
+            self._lower[key] = max(lower, beta)
+            return beta
+        self._exact[key] = best
+        self._moves[key] = best_guess
+        return best
+
+    def best_guess(self, candidates):
+        """Guess achieving value(candidates)."""
+        candidates = np.asarray(candidates, dtype=np.intp)
+        if len(candidates) <= 2:
+            return self.words[candidates[0]] if len(candidates) else None
+        self.value(candidates)
+        return self.words[self._moves[candidates.tobytes()]]
+
+    def solve(self, opener=None):
+        """Worst-case guarantee on the full list, optionally with a forced first guess."""
+        candidates = np.arange(len(self.words))
+        if opener is None:
+            return self.value(candidates), self.best_guess(candidates)
+        guess = self.words.index(opener)
+        worst = 1
+        for code, bucket in partition(self.engine, guess, candidates):
+            if code != self.solved:
+                worst = max(worst, 1 + self.value(bucket))
+        return worst, opener
+
+
+if __name__ == "__main__":
+    # python -m Solveur_wordle.adversarial --breadth 10 --opener tares
+    from Api_wordle.utils import get_word_list
+
+    parser = argparse.ArgumentParser(description="Worst-case (absurdle) guarantee of the Wordle solver")
+    parser.add_argument("--hard", action="store_true", help="hard mode (guesses among the candidates)")
+    parser.add_argument("--breadth", type=int, default=10, help="guesses tried per node (0 = all)")
+    parser.add_argument("--opener", default=None, help="force the first guess")
+    parser.add_argument("--length", type=int, default=5, help="word length")
+    args = parser.parse_args()
+
+    search = WorstCaseSearch(get_word_list(args.length), args.hard, args.breadth or None)
+    start = time.perf_counter()
+    guesses, first = search.solve(args.opener)
+    print(f"Worst case: {guesses} guesses with '{first}' ({time.perf_counter() - start:.1f}s, {search.stats})")
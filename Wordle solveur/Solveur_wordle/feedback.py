@@ -0,0 +1,115 @@
+import numpy as np
+
+# ---------- Feedback encoding ----------
+# One base-3 digit per position (B=0, Y=1, G=2), position 0 is the lowest digit.
+# For 5-letter words every pattern fits in a uint8 (3**5 = 243).
+DIGITS = {"B": 0, "Y": 1, "G": 2}
+LETTERS = "BYG"
+
+
+def pattern_dtype(length):
+    """Smallest unsigned dtype able to hold every pattern code of this length."""
+    if 3 ** length <= 1 << 8:
+        return np.uint8
+    return np.uint16 if 3 ** length <= 1 << 16 else np.uint32
+
+
+def pattern_to_code(fb):
+    """'BYBBG' -> integer pattern code."""
+    code = 0
+    for i, f in enumerate(fb):
+        code += DIGITS[f] * 3 ** i
+    return code
+
+
+def code_to_pattern(code, length=5):
+    """Integer pattern code -> 'BYBBG'."""
+    fb = []
+    for _ in range(length):
+        code, d = divmod(int(code), 3)
+        fb.append(LETTERS[d])
+    return "".join(fb)
+
+
+def encode_words(words):
+    """
+    Words -> (N, L) array of code points: one uint8 per letter for ASCII
+    lists (fixed-width packed records), uint32 otherwise.
+    """
+    words = list(words)
+    if not words:
+        return np.empty((0, 0), dtype=np.uint8)
+    text = "".join(words)
+    shape = (len(words), len(words[0]))
+    if text.isascii():
+        return np.frombuffer(text.encode("ascii"), dtype=np.uint8).reshape(shape)
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).reshape(shape)
+
+
+def decode_words(codes):
+    """(N, L) array from encode_words() -> list of words."""
+    if codes.size == 0:
+        return []
+    codes = np.ascontiguousarray(codes)
+    length = codes.shape[1]
+    if codes.dtype == np.uint8:
+        return codes.view(f"S{length}").ravel().astype(f"U{length}").tolist()
+    return codes.astype("<u4").view(f"<U{length}").ravel().tolist()
+
+
+def feedback_matrix(guesses, answers):
+    """
+    Pattern codes of every guess against every answer, with the usual
+    duplicate-letter rules (greens first, then yellows left to right
+    while the answer still has unmatched copies of the letter).
+
+    guesses: (G, L) encoded words, answers: (A, L) encoded words.
+    Returns a (G, A) array of pattern codes.
+    """
+    g = guesses[:, None, :]
+    a = answers[None, :, :]
+    length = guesses.shape[1]
+
+    green = g == a
+    codes = np.zeros(green.shape[:2], dtype=np.int64)
+    yellows = []
+    for i in range(length):
+        gi = g[:, :, i:i + 1]
+        available = ((a == gi) & ~green).sum(axis=2)
+        used = np.zeros_like(available)
+        for j in range(i):
+            used += yellows[j] & (g[:, :, j] == g[:, :, i])
+        yellow = ~green[:, :, i] & (used < available)
+        yellows.append(yellow)
+        codes += (2 * green[:, :, i] + yellow) * 3 ** i
+
+    return codes.astype(pattern_dtype(length))
+
+
+def feedback_code(guess, answer):
+    """
+    Pattern code of one guess against one answer (same rules as feedback_matrix).
+    Shared by the game endpoints, the solver loops and the simulator.
+    """
+    digits = [0] * len(guess)
+    remaining = {}
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            digits[i] = 2
+        else:
+            remaining[a] = remaining.get(a, 0) + 1
+    code = 0
+    for i, g in enumerate(guess):
+        if digits[i] == 0 and remaining.get(g, 0) > 0:
+            digits[i] = 1
+            remaining[g] -= 1
+        code += digits[i] * 3 ** i
+    return code
+
+
+def feedback_codes(guess, answers):
+    """
+    Batch mode: pattern codes of one guess against an (N, L) array of
+    encoded answers, in one vectorized pass.
+    """
+    return feedback_matrix(encode_words([guess]), answers)[0]
@@ -0,0 +1,170 @@
+import os
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+
+from .feedback import encode_words, feedback_matrix
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+STRATEGIES = ("entropy", "expected", "minimax")
+
+# Rows of the matrix handled per vectorized step (bounds temporary memory)
+BUILD_CHUNK = 128
+SCORE_CHUNK = 1024
+
+# The N x N matrix is only built for lists up to this size (word_list.txt: 12972 words, ~170 MB);
+# above, the matrix strategies are unavailable (see matrix_supported)
+MAX_MATRIX_WORDS = 16384
+# Above this many patterns (3 ** length), buckets are counted by sorting each row instead of
+# one bincount of SCORE_CHUNK * n_patterns cells
+MAX_BINCOUNT_PATTERNS = 3 ** 7
+
+
+def matrix_supported(words):
+    """True if the pattern matrix (and the strategies based on it) can be used for this list."""
+    return 0 < len(words) <= MAX_MATRIX_WORDS
+
+
+# ---------- Bucket counting ----------
+def bucket_sizes(codes, n_patterns):
+    """
+    Sizes of the feedback buckets of each row of `codes` (rows = guesses, columns = answers),
+    as an (n, width) array whose non-zero entries are the bucket sizes of that row.
+    """
+    codes = np.asarray(codes)
+    n, width = codes.shape
+    if n_patterns <= MAX_BINCOUNT_PATTERNS:
+        flat = codes.astype(np.intp) + (np.arange(n) * n_patterns)[:, None]
+        return np.bincount(flat.ravel(), minlength=n * n_patterns).reshape(n, n_patterns)
+    # Sorted row: one run per bucket, its size is stored at the start of the run
+    ordered = np.sort(codes, axis=1)
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    positions = np.arange(width)
+    following = np.full(ordered.shape, width)
+    following[:, :-1] = np.where(starts[:, 1:], positions[1:], width)
+    following = np.minimum.accumulate(following[:, ::-1], axis=1)[:, ::-1]
+    return np.where(starts, following - positions, 0)
+
+
+# ---------- Pattern matrix ----------
+def _matrix_path(words, cache_dir):
+    digest = hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"patterns_{len(words)}_{digest}.npy")
+
+
+def build_pattern_matrix(words, path):
+    """Compute the guess x answer pattern matrix and save it to `path`."""
+    encoded = encode_words(words)
+    n = len(words)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    first = feedback_matrix(encoded[:1], encoded)
+    matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=first.dtype, shape=(n, n))
+    for start in range(0, n, BUILD_CHUNK):
+        matrix[start:start + BUILD_CHUNK] = feedback_matrix(encoded[start:start + BUILD_CHUNK], encoded)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_path, path)
+
+
+def load_pattern_matrix(words, cache_dir=CACHE_DIR):
+    """Memory-map the pattern matrix for `words`, building it on first use."""
+    path = _matrix_path(words, cache_dir)
+    if not os.path.exists(path):
+        print(f"Building feedback pattern matrix ({len(words)}x{len(words)}) in {path}")
+        build_pattern_matrix(words, path)
+    return np.load(path, mmap_mode="r")
+
+
+# ---------- Guess engine ----------
+class GuessEngine:
+    """
+    Scores every word of the list as a probe against the current candidates
+    using the precomputed pattern matrix (rows = guesses, columns = answers).
+    """
+
+    def __init__(self, words, cache_dir=CACHE_DIR):
+        self.words = words if isinstance(words, tuple) else tuple(words)
+        if not matrix_supported(self.words):
+            raise ValueError(f"No pattern matrix for {len(self.words)} words (limit {MAX_MATRIX_WORDS})")
+        self.matrix = load_pattern_matrix(self.words, cache_dir)
+        self.n_patterns = 3 ** len(self.words[0]) if self.words else 0
+
+    def _bucket_sizes(self, rows, candidates):
+        """Bucket sizes of the candidate answers for each guess row (see bucket_sizes)."""
+        if isinstance(rows, slice):
+            sub = self.matrix[rows, candidates]
+        else:
+            sub = self.matrix[np.ix_(rows, candidates)]
+        return bucket_sizes(sub, self.n_patterns)
+
+    def scores(self, candidates, strategy="entropy", guesses=None):
+        """
+        Score of every guess (or of the `guesses` indices only, e.g. in hard mode)
+        for the given candidate indices, higher is better:
+        - entropy: expected information in bits
+        - expected: minus the expected number of remaining candidates
+        - minimax: minus the size of the largest remaining bucket
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+        candidates = np.asarray(candidates, dtype=np.intp)
+        total = len(candidates)
+        n_guesses = len(self.words) if guesses is None else len(guesses)
+        out = np.empty(n_guesses, dtype=np.float64)
+
+        for start in range(0, n_guesses, SCORE_CHUNK):
+            stop = min(start + SCORE_CHUNK, n_guesses)
+            rows = slice(start, stop)
+            counts = self._bucket_sizes(rows if guesses is None else guesses[rows], candidates)
+            if strategy == "entropy":
+                p = counts / total
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out[rows] = -np.nansum(p * np.log2(p), axis=1)
+            elif strategy == "expected":
+                out[rows] = -(counts.astype(np.float64) ** 2).sum(axis=1) / total
+            else:
+                out[rows] = -counts.max(axis=1)
+        return out
+
+    def ranked(self, candidates, strategy="entropy", k=5, guesses=None):
+        """
+        Best `k` probe words for the candidate indices, preferring possible answers on ties.
+        `guesses` restricts the probes to these word indices (hard mode).
+        """
+        candidates = np.asarray(candidates, dtype=np.intp)
+        if len(candidates) <= 2:
+            # Guessing a candidate directly is never worse here
+            return [self.words[i] for i in candidates[:k]]
+        if guesses is None:
+            guesses = np.arange(len(self.words))
+            scores = self.scores(candidates, strategy)
+        else:
+            guesses = np.asarray(guesses, dtype=np.intp)
+            scores = self.scores(candidates, strategy, guesses)
+        scores[np.isin(guesses, candidates, assume_unique=True)] += 1e-9
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [self.words[guesses[i]] for i in best]
+
+    def best_guess(self, candidates, strategy="entropy"):
+        """Best probe word for the candidate indices, or None if there is none."""
+        ranked = self.ranked(candidates, strategy, 1)
+        return ranked[0] if ranked else None
+
+    def suggest(self, solver, strategy="entropy"):
+        """Best probe word for the current state of a WordleSolver built on the same list."""
+        if solver.index.words is not self.words and solver.index.words != self.words:
+            raise ValueError("GuessEngine and WordleSolver must use the same word list")
+        return self.best_guess(solver.index.indices(solver.mask), strategy)
+
+
+@lru_cache(maxsize=2)
+def _build_engine(words):
+    return GuessEngine(words)
+
+
+def get_engine(wordlist):
+    """Return the shared guess engine for a word list, loading it on first use."""
+    return _build_engine(tuple(wordlist))
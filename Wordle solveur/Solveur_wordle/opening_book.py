@@ -0,0 +1,123 @@
+import os
+import gzip
+import json
+import hashlib
+import argparse
+
+import numpy as np
+
+from .feedback import code_to_pattern
+from .guess_engine import STRATEGIES, get_engine
+
+BOOK_DIR = os.path.join(os.path.dirname(__file__), "books")
+
+
+def history_key(steps):
+    """[{"guess": "crane", "feedback": "BYBBG"}, ...] -> 'crane:BYBBG|...'."""
+    return "|".join(f"{s['guess']}:{s['feedback']}" for s in steps)
+
+
+def words_digest(words):
+    return hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------- Opening book ----------
+class OpeningBook:
+    """
+    Decision tree of the first guesses, keyed by the feedback history.
+    The empty key holds the opening word.
+    """
+
+    def __init__(self, strategy, tree):
+        self.strategy = strategy
+        self.tree = tree
+
+    def first(self):
+        return self.tree.get("")
+
+    def next_guess(self, steps):
+        """Book move for this history, or None once the game leaves the book."""
+        return self.tree.get(history_key(steps))
+
+    def __len__(self):
+        return len(self.tree)
+
+
+def book_path(strategy, book_dir=BOOK_DIR, length=5):
+    # 5-letter books keep their historical name
+    name = strategy if length == 5 else f"{strategy}_{length}"
+    return os.path.join(book_dir, f"{name}.json.gz")
+
+
+def load_book(strategy, words, book_dir=BOOK_DIR):
+    """Load the book for `strategy`, or None if missing or built for another word list."""
+    path = book_path(strategy, book_dir, len(words[0]) if words else 5)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data["words_digest"] != words_digest(words):
+        print(f"Opening book {path} was built for another word list, ignored")
+        return None
+    return OpeningBook(data["strategy"], data["tree"])
+
+
+def load_books(words, book_dir=BOOK_DIR):
+    """All available books for this word list, keyed by strategy."""
+    books = {}
+    for strategy in STRATEGIES:
+        book = load_book(strategy, words, book_dir)
+        if book is not None:
+            books[strategy] = book
+    return books
+
+
+# ---------- Offline build ----------
+def build_book(words, strategy="entropy", depth=3, opener=None):
+    """Expand the decision tree `depth` guesses deep from the full word list."""
+    engine = get_engine(words)
+    all_candidates = np.arange(len(words))
+    position = {w: i for i, w in enumerate(words)}
+    solved = 3 ** len(words[0]) - 1
+    tree = {}
+
+    def expand(key, candidates, guess, level):
+        tree[key] = guess
+        if level == depth:
+            return
+        codes = np.asarray(engine.matrix[position[guess], candidates])
+        for code in np.unique(codes):
+            if code == solved:
+                continue
+            sub = candidates[codes == code]
+            step = f"{guess}:{code_to_pattern(code, len(guess))}"
+            child = f"{key}|{step}" if key else step
+            expand(child, sub, engine.best_guess(sub, strategy), level + 1)
+
+    expand("", all_candidates, opener or engine.best_guess(all_candidates, strategy), 1)
+    return OpeningBook(strategy, tree)
+
+
+def save_book(book, words, book_dir=BOOK_DIR):
+    os.makedirs(book_dir, exist_ok=True)
+    path = book_path(book.strategy, book_dir, len(words[0]))
+    data = {"strategy": book.strategy, "words_digest": words_digest(words), "tree": book.tree}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"), sort_keys=True)
+    return path
+
+
+if __name__ == "__main__":
+    # python -m Solveur_wordle.opening_book --strategy entropy --depth 3
+    from Api_wordle.utils import get_word_list
+
+    parser = argparse.ArgumentParser(description="Build the Wordle opening book")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="entropy")
+    parser.add_argument("--depth", type=int, default=3, help="number of guesses stored in the book")
+    parser.add_argument("--opener", default=None, help="force the first guess (default: best for the strategy)")
+    parser.add_argument("--length", type=int, default=5, help="word length")
+    args = parser.parse_args()
+
+    words = get_word_list(args.length)
+    book = build_book(words, args.strategy, args.depth, args.opener)
+    print(f"{len(book)} positions written to {save_book(book, words)}")
@@ -0,0 +1,117 @@
+import time
+from collections import namedtuple
+from functools import cached_property
+
+import numpy as np
+
+from .guess_engine import STRATEGIES as ENGINE_STRATEGIES, get_engine, matrix_supported
+
+# Candidates handled per vectorized step (bounds temporary memory on large lists)
+SCORE_CHUNK = 1 << 16
+
+# Ranked words of one strategy for one solver state, and the time it took to compute
+Suggestion = namedtuple("Suggestion", ["strategy", "words", "elapsed_ms"])
+
+
+# ---------- Per-state cache ----------
+class StateCache:
+    """
+    Precomputations over one candidate set (one solver mask), shared by every
+    scoring strategy, plus the rankings already computed for that set.
+    Dropped by the solver as soon as its mask changes.
+    """
+
+    def __init__(self, index, mask, guess_mask=None):
+        self.index = index
+        self.mask = mask
+        # Words allowed as guesses (hard mode), None = every word
+        self.guess_mask = guess_mask
+        # (strategy, k) -> Suggestion
+        self.rankings = {}
+
+    @cached_property
+    def ids(self):
+        return self.index.indices(self.mask)
+
+    @cached_property
+    def guess_ids(self):
+        return None if self.guess_mask is None else self.index.indices(self.guess_mask)
+
+    @cached_property
+    def candidates(self):
+        return [self.index.words[i] for i in self.ids]
+
+    @cached_property
+    def letter_ids(self):
+        """(n, L) position of every candidate letter in index.letters."""
+        out = np.empty((len(self.ids), self.index.length), dtype=np.uint16)
+        for start in range(0, len(self.ids), SCORE_CHUNK):
+            codes = np.asarray(self.index.codes[self.ids[start:start + SCORE_CHUNK]])
+            out[start:start + SCORE_CHUNK] = np.searchsorted(self.index.letters, codes)
+        return out
+
+    @cached_property
+    def presence(self):
+        """(n, A) bool: candidate contains letter a (at any position)."""
+        present = np.zeros((len(self.ids), len(self.index.letters)), dtype=bool)
+        rows = np.arange(len(self.ids))
+        for i in range(self.index.length):
+            present[rows, self.letter_ids[:, i]] = True
+        return present
+
+
+def _top(cache, scores, k):
+    # Only the best scores are sorted (ties broken like sorted(reverse=True) on (score, word))
+    k = min(k, len(scores))
+    threshold = np.partition(scores, -k)[-k]
+    scored = [(scores[j].item(), cache.index.words[cache.ids[j]]) for j in np.flatnonzero(scores >= threshold)]
+    scored.sort(reverse=True)
+    return [w for _, w in scored[:k]]
+
+
+# ---------- Strategies ----------
+def frequency(cache, k):
+    """Letter frequency over the candidates, each distinct letter of a word counted once."""
+    present = cache.presence
+    return _top(cache, present @ present.sum(axis=0), k)
+
+
+def positional(cache, k):
+    """Letter frequency per position: rewards letters often seen at that exact position."""
+    letter_ids = cache.letter_ids
+    n_letters = len(cache.index.letters)
+    scores = np.zeros(len(letter_ids), dtype=np.int64)
+    for i in range(cache.index.length):
+        column = letter_ids[:, i]
+        scores += np.bincount(column, minlength=n_letters)[column]
+    return _top(cache, scores, k)
+
+
+def _engine_scorer(strategy):
+    def score(cache, k):
+        if not matrix_supported(cache.index.words):
+            # List too large for an N x N matrix: letter frequencies instead
+            return frequency(cache, k)
+        engine = get_engine(cache.index.words)
+        return engine.ranked(cache.ids, strategy, k, cache.guess_ids)
+    score.__name__ = strategy
+    score.__doc__ = (f"'{strategy}' score of every word of the list, from the pattern matrix (guess_engine),"
+                     " frequency on lists too large for the matrix.")
+    return score
+
+
+SCORERS = {"frequency": frequency, "positional": positional}
+SCORERS.update({name: _engine_scorer(name) for name in ENGINE_STRATEGIES})
+
+
+def rank(cache, strategy="frequency", k=5):
+    """Best `k` words for this state, computed once per (strategy, k) and timed."""
+    key = (strategy, k)
+    if key not in cache.rankings:
+        scorer = SCORERS.get(strategy)
+        if scorer is None:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {tuple(SCORERS)}")
+        start = time.perf_counter()
+        words = scorer(cache, k) if len(cache.ids) else []
+        cache.rankings[key] = Suggestion(strategy, words, (time.perf_counter() - start) * 1000)
+    return cache.rankings[key]
@@ -0,0 +1,137 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+from .Solveur_Wordle import WordleSolver, default_opener
+from .adversarial import AbsurdleHost
+from .feedback import code_to_pattern, feedback_code
+from .guess_engine import STRATEGIES
+from .opening_book import load_book
+from .wordlist import load_words
+
+MAX_GUESSES = 6
+# Hard stop for the simulation, games longer than MAX_GUESSES count as failures
+GIVE_UP_AFTER = 20
+
+
+# ---------- Offline game (no HTTP, no LLM) ----------
+def play_game(target, wordlist, strategy=None, book=None, hard_mode=False):
+    """
+    Solve `target` locally with the same guess policy as the API
+    (opening book for the pattern-matrix strategies, then solver.suggest(strategy)).
+
+    Returns {"target", "guesses", "solved", "steps", "apply_ms", "suggest_ms"}.
+    """
+    solver = WordleSolver(wordlist, hard_mode)
+    guess = (book.first() if book else None) or default_opener(wordlist)
+    steps, apply_ms, suggest_ms = [], [], []
+
+    while guess is not None and len(steps) < GIVE_UP_AFTER:
+        feedback = code_to_pattern(feedback_code(guess, target), len(guess))
+        steps.append({"step": len(steps) + 1, "guess": guess, "feedback": feedback})
+        if guess == target:
+            break
+
+        t0 = time.perf_counter()
+        solver.apply_feedback(guess, feedback)
+        t1 = time.perf_counter()
+        guess = book.next_guess(steps) if book else None
+        if guess is None or not solver.is_allowed(guess):
+            suggestions = solver.suggest(strategy or "frequency", 1)
+            guess = suggestions[0] if suggestions else None
+        t2 = time.perf_counter()
+        apply_ms.append((t1 - t0) * 1000)
+        suggest_ms.append((t2 - t1) * 1000)
+
+    solved = bool(steps) and steps[-1]["guess"] == target
+    return {
+        "target": target,
+        "guesses": len(steps),
+        "solved": solved,
+        "steps": steps,
+        "apply_ms": apply_ms,
+        "suggest_ms": suggest_ms,
+    }
+
+
+# ---------- Process pool workers ----------
+# Each worker process loads the word list once and keeps one opening book per strategy
+_books = {}
+
+
+def _book_for(strategy, words):
+    key = (strategy, len(words[0]) if words else 0)
+    if key not in _books:
+        _books[key] = load_book(strategy, words) if strategy in STRATEGIES else None
+    return _books[key]
+
+
+def play_games(targets, strategy=None, hard_mode=False):
+    """Play a chunk of games in the current process (pool task), without the steps."""
+    words = load_words(len(targets[0])).sorted if targets else ()
+    book = _book_for(strategy, words)
+    results = []
+    for target in targets:
+        result = play_game(target, words, strategy, book, hard_mode)
+        del result["steps"]
+        results.append(result)
+    return results
+
+
+def play_absurdle(wordlist, strategy=None, hard_mode=False):
+    """
+    Play against the adversarial host (absurdle): no fixed target, the host keeps
+    the largest feedback bucket after each guess. Returns {"guesses", "solved", "steps"}.
+    """
+    host = AbsurdleHost(wordlist)
+    solver = WordleSolver(wordlist, hard_mode)
+    guess = default_opener(wordlist)
+    steps = []
+
+    while guess is not None and len(steps) < GIVE_UP_AFTER:
+        feedback = host.respond(guess)
+        steps.append({"step": len(steps) + 1, "guess": guess, "feedback": feedback})
+        if feedback == "G" * len(guess):
+            break
+        solver.apply_feedback(guess, feedback)
+        suggestions = solver.suggest(strategy or "frequency", 1)
+        guess = suggestions[0] if suggestions else None
+
+    solved = bool(steps) and steps[-1]["feedback"] == "G" * len(steps[-1]["guess"])
+    return {"guesses": len(steps), "solved": solved, "steps": steps}
+
+
+def chunked(targets, n_chunks):
+    size = max(1, -(-len(targets) // n_chunks))
+    return [targets[i:i + size] for i in range(0, len(targets), size)]
+
+
+# ---------- Stats ----------
+def percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 4), "p95": round(float(p95), 4), "p99": round(float(p99), 4)}
+
+
+def summarize(results, strategy, elapsed):
+    """Aggregate statistics of a batch of play_game() results."""
+    guesses = [r["guesses"] for r in results]
+    failed = [r["target"] for r in results if not r["solved"] or r["guesses"] > MAX_GUESSES]
+    apply_ms = [t for r in results for t in r["apply_ms"]]
+    suggest_ms = [t for r in results for t in r["suggest_ms"]]
+    return {
+        "strategy": strategy or "frequency",
+        "games": len(results),
+        "mean_guesses": round(float(np.mean(guesses)), 4) if guesses else 0.0,
+        "distribution": {str(k): v for k, v in sorted(Counter(guesses).items())},
+        "failure_rate": round(len(failed) / len(results), 6) if results else 0.0,
+        "failed_words": sorted(failed),
+        "latency_ms": {
+            "apply_feedback": percentiles(apply_ms),
+            "suggest": percentiles(suggest_ms),
+        },
+        "elapsed_s": round(elapsed, 3),
+        "games_per_s": round(len(results) / elapsed, 2) if elapsed else 0.0,
+    }
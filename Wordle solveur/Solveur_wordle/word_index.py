@@ -0,0 +1,118 @@
+import numpy as np
+
+from .feedback import encode_words
+
+# Words per index-building step (multiple of 8 so packed chunks line up on bytes)
+INDEX_CHUNK = 1 << 16
+
+
+def _pack(bits):
+    """Pack a (P, A, n) bool array into bytes along the last axis, bit 0 first."""
+    if bits.shape[2] % 8:
+        return np.packbits(bits, axis=2, bitorder="little")
+    # Whole bytes per row: packing the flat buffer gives the same bytes, faster
+    return np.packbits(bits.reshape(-1), bitorder="little").reshape(bits.shape[0], bits.shape[1], -1)
+
+
+# ---------- Bitset index ----------
+class WordIndex:
+    """
+    Precomputed bitsets over a fixed word list.
+
+    Bit i of every mask stands for words[i], so applying a Wordle constraint
+    is a single AND / AND NOT on Python big integers instead of a scan of the
+    whole list.
+    """
+
+    def __init__(self, words, codes=None):
+        self.words = words if isinstance(words, tuple) else tuple(words)
+        self.size = len(self.words)
+        self.length = len(self.words[0]) if self.words else 0
+        self.all = (1 << self.size) - 1
+        self._nbytes = (self.size + 7) // 8
+
+        # (position, letter) -> words having that letter at that position
+        self.pos_masks = {}
+        # (letter, k) -> words containing the letter at least k times
+        self.count_masks = {}
+
+        if not self.words:
+            return
+
+        self.codes = encode_words(self.words) if codes is None else codes
+        # Distinct letter codes, sorted
+        self.letters = np.unique(self.codes)
+        letter_names = [chr(code) for code in self.letters]
+
+        # Built over fixed-size chunks of words so temporary arrays stay bounded
+        # on large dictionaries; each chunk adds INDEX_CHUNK / 8 bytes per mask.
+        pos_parts = {}
+        count_parts = {}
+        for start in range(0, self.size, INDEX_CHUNK):
+            chunk = np.asarray(self.codes[start:start + INDEX_CHUNK])
+            # hits[i, a, w]: word w has letter a at position i
+            hits = chunk.T[:, None, :] == self.letters[None, :, None]
+            packed = _pack(hits)
+            # Occurrences per (letter, word), summed in uint8 (much faster than bool.sum)
+            flags = hits.view(np.uint8)
+            counts = flags[0].copy()
+            for i in range(1, self.length):
+                counts += flags[i]
+            packed_counts = _pack(counts[None, :, :] >= np.arange(1, self.length + 1)[:, None, None])
+            for a, ch in enumerate(letter_names):
+                for i in range(self.length):
+                    pos_parts.setdefault((i, ch), []).append(packed[i, a].tobytes())
+                    count_parts.setdefault((ch, i + 1), []).append(packed_counts[i, a].tobytes())
+
+        for parts, masks in ((pos_parts, self.pos_masks), (count_parts, self.count_masks)):
+            for key, chunks in parts.items():
+                mask = int.from_bytes(b"".join(chunks), "little")
+                if mask:
+                    masks[key] = mask
+
+    def position(self, i, ch):
+        """Words with letter `ch` at position `i`."""
+        return self.pos_masks.get((i, ch), 0)
+
+    def at_least(self, ch, k):
+        """Words containing `ch` at least `k` times."""
+        if k <= 0:
+            return self.all
+        return self.count_masks.get((ch, k), 0)
+
+    def indices(self, mask):
+        """Indices of the words set in `mask`."""
+        if not mask:
+            return np.empty(0, dtype=np.intp)
+        raw = np.frombuffer(mask.to_bytes(self._nbytes, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")[: self.size])
+
+    def words_for(self, mask):
+        """Words set in `mask`, in word-list order."""
+        return [self.words[i] for i in self.indices(mask)]
+
+
+_indexes = {}
+
+
+def _build_index(words, codes=None):
+    # A few word lists at most (one per word length in practice)
+    if words not in _indexes:
+        _indexes[words] = WordIndex(words, codes)
+    return _indexes[words]
+
+
+# Shared tuples (see wordlist.load_words) are looked up by identity,
+# which avoids hashing a large dictionary on every new solver
+_by_identity = {}
+
+
+def get_index(wordlist, codes=None):
+    """Return the shared index for a word list, building it on first use."""
+    entry = _by_identity.get(id(wordlist))
+    if entry is not None and entry[0] is wordlist:
+        return entry[1]
+    index = _build_index(tuple(wordlist), codes)
+    if isinstance(wordlist, tuple):
+        _by_identity[id(wordlist)] = (wordlist, index)
+    return index
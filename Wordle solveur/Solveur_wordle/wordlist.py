@@ -0,0 +1,107 @@
+import os
+from functools import lru_cache, cached_property
+
+import numpy as np
+
+from .feedback import decode_words, encode_words
+from .word_index import get_index
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+WORD_FILE = os.path.join(PROJECT_ROOT, "word_list.txt")
+CACHE_DIR = os.path.join(PROJECT_ROOT, "cache")
+DEFAULT_LENGTH = 5
+
+
+# ---------- Shared word list ----------
+class WordList:
+    """
+    Word list read once and shared by the API and the solver.
+
+    - words: file order (used for the deterministic word of the day, decoded on first use)
+    - sorted: alphabetical order (the order used by the solver, index and guess engine)
+    - valid: frozenset for O(1) membership checks
+    - codes: (N, L) packed array of the sorted words
+    """
+
+    def __init__(self, sorted_words, codes, file_order):
+        self.sorted = tuple(sorted_words)
+        self.codes = codes
+        self.length = len(self.sorted[0]) if self.sorted else 0
+        self.valid = frozenset(self.sorted)
+        # Either the file-order tuple or its packed array
+        self._file_order = file_order
+
+    @classmethod
+    def from_words(cls, words):
+        words = tuple(words)
+        sorted_words = sorted(words)
+        return cls(sorted_words, encode_words(sorted_words), words)
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def __contains__(self, word):
+        return word in self.valid
+
+    @cached_property
+    def words(self):
+        if isinstance(self._file_order, tuple):
+            return self._file_order
+        return tuple(decode_words(self._file_order))
+
+    @cached_property
+    def index(self):
+        """Bitset index of the sorted words (shared by every WordleSolver)."""
+        return get_index(self.sorted, self.codes)
+
+
+def word_file(length=DEFAULT_LENGTH):
+    """word_list_<length>.txt if it exists, otherwise the main word_list.txt."""
+    path = os.path.join(PROJECT_ROOT, f"word_list_{length}.txt")
+    return path if os.path.exists(path) else WORD_FILE
+
+
+# ---------- Packed cache ----------
+# Fixed-width records (one uint8 per letter) of the file-order and sorted words,
+# memory-mapped on the next start instead of parsing and sorting the text file again.
+def _packed_paths(path, length):
+    st = os.stat(path)
+    stem = f"words_{os.path.basename(path)}_{length}_{st.st_size}_{st.st_mtime_ns}"
+    return os.path.join(CACHE_DIR, stem + ".npy"), os.path.join(CACHE_DIR, stem + "_sorted.npy")
+
+
+def _read_text(path, length):
+    with open(path, "r", encoding="utf-8") as f:
+        words = [w for w in (line.strip().lower() for line in f)
+                 if len(w) == length and not w.startswith("#")]
+    return list(dict.fromkeys(words))
+
+
+def _save_packed(packed_path, codes):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = packed_path + ".tmp.npy"
+    np.save(tmp_path, codes)
+    os.replace(tmp_path, packed_path)
+
+
+@lru_cache(maxsize=None)
+def load_words(length=DEFAULT_LENGTH, path=None):
+    """Words of `length` letters, read once per process (and per length)."""
+    path = path or word_file(length)
+    packed_path, sorted_path = _packed_paths(path, length)
+
+    if os.path.exists(packed_path) and os.path.exists(sorted_path):
+        file_codes = np.load(packed_path, mmap_mode="r")
+        sorted_codes = np.load(sorted_path, mmap_mode="r")
+        word_list = WordList(decode_words(sorted_codes), sorted_codes, file_codes)
+    else:
+        word_list = WordList.from_words(_read_text(path, length))
+        if len(word_list):
+            try:
+                _save_packed(packed_path, encode_words(word_list.words))
+                _save_packed(sorted_path, word_list.codes)
+            except OSError:
+                pass  # read-only checkout: the cache is only an optimisation
+
+    print(f"Loaded {len(word_list)} words from {os.path.basename(path)}")
+    return word_list
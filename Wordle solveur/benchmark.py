@@ -0,0 +1,88 @@
+"""
+Batch benchmark of the Wordle solver: plays every word of word_list.txt
+(or a sample) locally, without HTTP and without the LLM.
+
+    python benchmark.py --sample 500 --out cache/baseline.json
+    python benchmark.py --sample 500 --compare cache/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from Api_wordle.utils import get_word_list
+from Solveur_wordle.scoring import SCORERS
+from Solveur_wordle.simulation import chunked, play_games, summarize
+
+# A regression is reported when the mean number of guesses grows by more than 0.02,
+# or when the p95 latency of apply_feedback / suggest exceeds 1.5x the baseline
+MEAN_GUESSES_TOLERANCE = 0.02
+LATENCY_TOLERANCE = 1.5
+
+
+# ---------- Stats ----------
+def compare(report, baseline):
+    """List of regressions of `report` against `baseline` (empty if none)."""
+    problems = []
+    if report["mean_guesses"] > baseline["mean_guesses"] + MEAN_GUESSES_TOLERANCE:
+        problems.append(f"mean guesses {baseline['mean_guesses']} -> {report['mean_guesses']}")
+    if report["failure_rate"] > baseline["failure_rate"]:
+        problems.append(f"failure rate {baseline['failure_rate']} -> {report['failure_rate']}")
+    for stage in ("apply_feedback", "suggest"):
+        old = baseline["latency_ms"][stage]["p95"]
+        new = report["latency_ms"][stage]["p95"]
+        if old and new > old * LATENCY_TOLERANCE:
+            problems.append(f"{stage} p95 {old}ms -> {new}ms")
+    return problems
+
+
+# ---------- Main ----------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wordle solver on the whole word list")
+    parser.add_argument("--strategy", choices=tuple(SCORERS), default="frequency")
+    parser.add_argument("--sample", type=int, default=None, help="number of random target words (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--length", type=int, default=5, help="word length")
+    parser.add_argument("--hard", action="store_true", help="hard mode (guesses must use the revealed hints)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default=None, help="write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="baseline JSON report to check for regressions")
+    args = parser.parse_args()
+
+    strategy = None if args.strategy == "frequency" else args.strategy
+    targets = get_word_list(args.length)
+    if args.sample:
+        targets = random.Random(args.seed).sample(targets, min(args.sample, len(targets)))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        chunks = chunked(list(targets), args.workers * 8)
+        parts = pool.map(play_games, chunks, [strategy] * len(chunks), [args.hard] * len(chunks))
+        results = [r for part in parts for r in part]
+    report = summarize(results, strategy, time.perf_counter() - start)
+    report["sample"] = args.sample
+    report["seed"] = args.seed
+    report["hard_mode"] = args.hard
+
+    print(json.dumps({k: v for k, v in report.items() if k != "failed_words"}, indent=2))
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            problems = compare(report, json.load(f))
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
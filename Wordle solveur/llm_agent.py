@@ -1,6 +1,9 @@
 # llm_agent.py
 import os
+import re
+import asyncio
 import logging
+from collections import OrderedDict
 # Assurez-vous d'avoir installé google-generativeai : pip install google-generativeai
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -26,41 +29,33 @@ if GEMINI_AVAILABLE and GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
     logging.info("Gemini API configured")
 
+GEMINI_MODEL = "gemini-2.5-flash"
+# Délai max d'un appel LLM avant de retomber sur la suggestion CSP (secondes)
+LLM_TIMEOUT = float(os.environ.get("WORDLE_LLM_TIMEOUT", 5.0))
+LLM_CACHE_SIZE = int(os.environ.get("WORDLE_LLM_CACHE_SIZE", 4096))
+
+_model = None
+
+def get_model():
+    """Client Gemini partagé (créé une seule fois), ou None si l'API n'est pas disponible."""
+    global _model
+    if _model is None and GEMINI_AVAILABLE and GEMINI_API_KEY:
+        _model = genai.GenerativeModel(GEMINI_MODEL)
+    return _model
+
 # ---------- CSP helper ----------
 def get_best_csp_suggestions(solver, k=5):
-    """Récupère les meilleures suggestions du solver CSP."""
-    suggestions = solver.suggest()[:k]
-    logging.info(f"CSP suggestions (top {k}): {suggestions}")
-    return suggestions
+    """Récupère les meilleures suggestions du solver CSP (calculées une fois par état du solver)."""
+    suggestion = solver.rank("frequency", k)
+    logging.debug(f"CSP suggestions (top {k}, {suggestion.elapsed_ms:.2f} ms): {suggestion.words}")
+    return suggestion.words
 
 def choose_word(word: str):
     """Wrapper simple pour sélectionner un mot."""
     return {"chosen_word": word}
 
-# ---------- Main LLM decision ----------
-def llm_choose_next_guess(solver, previous_steps):
-    """
-    Sélectionne le prochain mot à deviner en utilisant Google Gemini.
-    Si Gemini non disponible, retourne la suggestion CSP classique.
-    """
-
-    logging.info("\n================ LLM DECISION STEP ================")
-
-    candidates = get_best_csp_suggestions(solver, k=5)
-
-    if not candidates:
-        logging.info("No CSP candidates available, using solver default")
-        return solver.suggest()[0]
-
-    if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
-        logging.info("CSP fallback triggered (API not available or configured)")
-        logging.info(f"Chosen word (CSP): {candidates[0]}")
-        return candidates[0]
-
-    try:
-        logging.info("Calling Gemini LLM...")
-
-        prompt = f"""
+def build_prompt(solver, previous_steps, candidates):
+    return f"""
 You are a Wordle-solving agent.
 
 Rules:
@@ -71,7 +66,7 @@ Rules:
 Previous guesses:
 {previous_steps}
 
-Remaining candidates: {len(solver.candidates)}
+Remaining candidates: {solver.mask.bit_count()}
 
 Candidate words:
 {candidates}
@@ -79,26 +74,110 @@ Candidate words:
 Reply with ONLY the chosen word.
 """
 
-        # Instanciation du modèle (correction pour ancienne API)
-        model = genai.GenerativeModel("gemini-2.5-flash")
+# ---------- Async advisor ----------
+class StubModel:
+    """
+    Modèle local pour tester l'agent hors ligne : répond `reply` (str ou fonction du prompt)
+    après `delay` secondes. Par défaut il choisit le dernier mot de la liste de candidats.
+    """
 
-        # CORRECTION DÉFINITIVE : Appel minimaliste (uniquement le prompt)
-        response = model.generate_content(prompt)
+    class _Response:
+        def __init__(self, text):
+            self.text = text
 
-        # Accès au résultat via .text (correction pour ancienne API)
-        chosen = response.text.strip().lower()
+    def __init__(self, reply=None, delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
 
-        logging.info(f"Gemini raw response: '{chosen}'")
+    def _answer(self, prompt):
+        if callable(self.reply):
+            return self.reply(prompt)
+        if self.reply is not None:
+            return self.reply
+        words = re.findall(r"'([a-z]+)'", prompt.split("Candidate words:")[-1])
+        return words[-1] if words else ""
 
-        if chosen in candidates:
-            logging.info(f"Gemini choice accepted: {chosen}")
-            return chosen
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self._Response(self._answer(prompt))
 
-        logging.info(f"Gemini returned invalid word: '{chosen}', fallback to CSP")
 
-    except Exception as e:
-        logging.info(f"Gemini error, fallback to CSP: {e}")
+class LLMAdvisor:
+    """
+    Choix du prochain mot par le LLM sans bloquer la boucle asyncio :
+    - délai max par appel (LLM_TIMEOUT), sinon suggestion CSP
+    - client réutilisé
+    - cache LRU par (historique des feedbacks, ensemble de candidats)
+    - les requêtes identiques en cours partagent un seul appel
+    """
 
-    # Fallback CSP
-    logging.info(f"Chosen word (CSP fallback): {candidates[0]}")
-    return candidates[0]
\ No newline at end of file
+    def __init__(self, model=None, timeout=LLM_TIMEOUT, cache_size=LLM_CACHE_SIZE):
+        self.model = model
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self.stats = {"calls": 0, "cache_hits": 0, "coalesced": 0, "fallbacks": 0}
+
+    def _key(self, solver, previous_steps):
+        history = tuple((s["guess"], s["feedback"]) for s in previous_steps)
+        return history, solver.mask.bit_count(), hash(solver.mask)
+
+    async def _generate(self, prompt):
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt)
+        return await asyncio.to_thread(self.model.generate_content, prompt)
+
+    async def _ask(self, prompt, candidates):
+        self.stats["calls"] += 1
+        try:
+            response = await asyncio.wait_for(self._generate(prompt), self.timeout)
+            chosen = response.text.strip().lower()
+            logging.info(f"LLM raw response: '{chosen}'")
+            if chosen in candidates:
+                return chosen
+            logging.info(f"LLM returned invalid word: '{chosen}', fallback to CSP")
+        except asyncio.TimeoutError:
+            logging.info(f"LLM timeout after {self.timeout}s, fallback to CSP")
+        except Exception as e:
+            logging.info(f"LLM error, fallback to CSP: {e}")
+        return None
+
+    def _remember(self, key, word):
+        self._cache[key] = word
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def choose_next_guess(self, solver, previous_steps):
+        candidates = get_best_csp_suggestions(solver, k=5)
+        if not candidates:
+            return None
+        if self.model is None:
+            self.stats["fallbacks"] += 1
+            return candidates[0]
+
+        key = self._key(solver, previous_steps)
+        if key in self._cache:
+            self.stats["cache_hits"] += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            prompt = build_prompt(solver, previous_steps, candidates)
+            task = asyncio.ensure_future(self._ask(prompt, candidates))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+
+        # shield : l'annulation d'un appelant n'annule pas l'appel partagé
+        chosen = await asyncio.shield(task)
+        if chosen is None:
+            self.stats["fallbacks"] += 1
+            return candidates[0]
+        self._remember(key, chosen)
+        return chosen